@@ -12,6 +12,7 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.screenmanager import ScreenManager
 
 from core.config import get_config
+from core.monitor import SearchMonitor
 from core.sudoku import Table
 from version import __version__
 from widgets.confirm_popup import ConfirmPopup
@@ -19,6 +20,10 @@ from widgets.dial import DialButton
 from widgets.operation_button import OperationButton, ToggleOperationButton
 from widgets.sudoku_widget import SudokuCell
 
+# Longest the UI thread may spend searching; underconstrained OCR results can
+# otherwise keep the search busy for minutes.
+SOLVE_TIMEOUT = 2.0
+
 
 class RootLayout(FloatLayout):
     """App shell: version chrome in KV; screens added from Python."""
@@ -118,7 +123,7 @@ class SudokuApp(App):
             return
 
         if self.table.validate(self.table.sudoku_array):
-            self.table.solve()
+            self.table.solve(monitor=SearchMonitor(timeout=SOLVE_TIMEOUT))
 
         is_solved = self.table.is_solved()
         instance.toggled = is_solved
@@ -148,7 +153,7 @@ class SudokuApp(App):
         if self.selected_cell is not None:
             x, y = self.selected_cell.idx
             if self.table.given_sudoku[x, y] == 0:
-                self.table.sudoku_array[x, y] = 0
+                self.table.remove_number(x, y)
                 self.sudoku_cells[x * 9 + y].number = 0
                 return
 
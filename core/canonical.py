@@ -0,0 +1,303 @@
+"""Canonical forms of sudoku grids and a solution cache keyed on them.
+
+Relabelling the digits, transposing, permuting the bands (and the stacks) and the
+rows within a band (and the columns within a stack) all map a puzzle onto an
+equivalent one. ``canonical_form`` picks the lexicographically smallest grid of
+that whole orbit, with digits relabelled in order of first appearance, so every
+transformed copy of a puzzle shares one representative.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import permutations, product
+
+import numpy as np
+
+_PERMUTATIONS = np.array(list(permutations(range(3))))
+# All 1296 orders of the nine columns that keep the stacks together.
+_COLUMN_ORDERS = np.array(
+    [
+        [3 * stack + offset for stack, inner in zip(stacks, inners) for offset in inner]
+        for stacks in _PERMUTATIONS
+        for inners in product(_PERMUTATIONS, repeat=3)
+    ],
+    dtype=np.intp,
+)
+_ROW_WEIGHTS = 10 ** np.arange(8, -1, -1, dtype=np.int64)
+# Frontiers up to this size are cheaper to expand than to deduplicate.
+_MERGE_THRESHOLD = 256
+_SIGNATURE_WEIGHTS = np.random.default_rng(0x5D0C).integers(
+    0, 2**64, size=90, dtype=np.uint64, endpoint=False
+) | np.uint64(1)
+
+
+@dataclass(frozen=True, slots=True)
+class Transform:
+    """A symmetry of the sudoku: ``apply`` maps a grid onto its canonical orientation."""
+
+    transpose: bool
+    # Row ``i`` of the result is row ``rows[i]`` of the (transposed) grid; same for columns.
+    rows: np.ndarray
+    columns: np.ndarray
+    # ``labels[n]`` is the digit ``n`` becomes; ``labels[0] == 0`` keeps empty cells empty.
+    labels: np.ndarray
+
+    def apply(self, grid: np.ndarray) -> np.ndarray:
+        """Map a grid in the original orientation to the canonical one."""
+        grid = grid.T if self.transpose else grid
+        return self.labels[grid[np.ix_(self.rows, self.columns)]]
+
+    def invert(self, grid: np.ndarray) -> np.ndarray:
+        """Map a grid in the canonical orientation back to the original one."""
+        inverse = np.empty_like(self.labels)
+        inverse[self.labels] = np.arange(len(self.labels), dtype=self.labels.dtype)
+        original = np.empty_like(grid)
+        original[np.ix_(self.rows, self.columns)] = inverse[grid]
+        return original.T if self.transpose else original
+
+    def apply_cube(self, cube: np.ndarray) -> np.ndarray:
+        """Map an ``(N, N, N)`` candidate cube the way ``apply`` maps its grid."""
+        cube = cube.swapaxes(0, 1) if self.transpose else cube
+        moved = np.empty_like(cube)
+        moved[..., self.labels[1:] - 1] = cube[np.ix_(self.rows, self.columns)]
+        return moved
+
+
+def random_transform(seed: int, box: int) -> Transform:
+    """A random symmetry of the board: bands, stacks, their rows and columns and digits."""
+    rng = np.random.default_rng(seed)
+
+    def lines() -> np.ndarray:
+        bands = rng.permutation(box)
+        return np.concatenate([band * box + rng.permutation(box) for band in bands])
+
+    size = box * box
+    return Transform(
+        transpose=bool(rng.integers(2)),
+        rows=lines(),
+        columns=lines(),
+        labels=np.concatenate(([0], rng.permutation(size) + 1)).astype(np.int8),
+    )
+
+
+def _relabel_rows(
+    rows: np.ndarray, labels: np.ndarray, next_label: np.ndarray
+) -> np.ndarray:
+    """Relabel one row per state, numbering new digits in order of first appearance.
+    Args:
+        rows (np.ndarray): ``(S, 9)`` original digits.
+        labels (np.ndarray): ``(S, 10)`` labels given so far (0 if none), updated in place.
+        next_label (np.ndarray): ``(S,)`` the next free label per state, updated in place.
+    Returns:
+        np.ndarray: ``(S, 9)`` relabelled rows.
+    """
+    states = np.arange(len(rows))
+    for col in range(9):
+        digits = rows[:, col]
+        new = (digits > 0) & (labels[states, digits] == 0)
+        labels[states[new], digits[new]] = next_label[new]
+        next_label += new
+    return labels[states[:, None], rows]
+
+
+def _rows_are_distinct(orientations: np.ndarray) -> bool:
+    """Whether no row of either orientation repeats a digit."""
+    counts = np.apply_along_axis(np.bincount, -1, orientations, minlength=10)
+    return bool((counts[..., 1:] <= 1).all())
+
+
+def _distinct_states(
+    orientations: np.ndarray,
+    chosen: np.ndarray,
+    orientation: np.ndarray,
+    columns: np.ndarray,
+    labels: np.ndarray,
+) -> np.ndarray:
+    """Indices of one state per group of states that can only lead to the same results.
+
+    States that picked the same rows and see the same column-ordered, relabelled grid
+    (digits without a label yet kept apart) branch identically from here on. Without
+    merging them, grids with many empty rows tie on thousands of column orders.
+    """
+    states = np.arange(len(chosen))
+    if len(states) <= _MERGE_THRESHOLD:
+        return states
+    grids = np.take_along_axis(orientations[orientation], columns[:, None, :], axis=2)
+    pending = np.arange(10, 20)
+    pending[0] = 0
+    seen = np.where(labels == 0, pending, labels)
+    signatures = np.concatenate(
+        (chosen, seen[states[:, None], grids.reshape(len(chosen), 81)]), axis=1
+    ).astype(np.uint64)
+    # Hashing the rows is far faster than ``np.unique(axis=0)``; with random 64-bit
+    # weights a collision between two different states is practically impossible.
+    hashes = signatures @ _SIGNATURE_WEIGHTS[: signatures.shape[1]]
+    return np.unique(hashes, return_index=True)[1]
+
+
+def canonical_form(grid: np.ndarray) -> tuple[np.ndarray, Transform]:
+    """Find the canonical representative of a grid under the sudoku symmetry group.
+
+    Builds the result row by row, keeping only the partial transforms whose rows so
+    far are lexicographically smallest. The first row fixes the column order, so
+    later rows only branch over the remaining rows of a band.
+    Args:
+        grid (np.ndarray): A ``(9, 9)`` grid, 0 for empty cells.
+    Returns:
+        tuple[np.ndarray, Transform]: The canonical grid and the transform mapping
+            ``grid`` onto it.
+    """
+    grid = np.asarray(grid, dtype=np.int8)
+    orientations = np.stack((grid, grid.T)).astype(np.intp)
+
+    # First row: every orientation, every row and every column order.
+    states = np.arange(2 * 9 * len(_COLUMN_ORDERS))
+    if _rows_are_distinct(orientations):
+        # Without repeats the first row's labels just count up, so only the
+        # positions of its empty cells matter.
+        filled = (orientations.reshape(18, 9) > 0)[:, _COLUMN_ORDERS]
+        keys = (np.cumsum(filled, axis=-1, dtype=np.int8) * filled).reshape(
+            -1, 9
+        ) @ _ROW_WEIGHTS
+        states = np.flatnonzero(keys == keys.min())
+    orientation, rest = np.divmod(states, 9 * len(_COLUMN_ORDERS))
+    first, order = np.divmod(rest, len(_COLUMN_ORDERS))
+    columns = _COLUMN_ORDERS[order]
+    rows = np.take_along_axis(orientations[orientation, first], columns, axis=1)
+    labels = np.zeros((len(rows), 10), dtype=np.intp)
+    next_label = np.ones(len(rows), dtype=np.intp)
+    keys = _relabel_rows(rows, labels, next_label) @ _ROW_WEIGHTS
+    keep = np.flatnonzero(keys == keys.min())
+    chosen = first[keep, None]
+    orientation, columns, labels, next_label = (
+        orientation[keep],
+        columns[keep],
+        labels[keep],
+        next_label[keep],
+    )
+    keep = _distinct_states(orientations, chosen, orientation, columns, labels)
+    chosen, orientation, columns, labels, next_label = (
+        chosen[keep],
+        orientation[keep],
+        columns[keep],
+        labels[keep],
+        next_label[keep],
+    )
+
+    for depth in range(1, 9):
+        band_start = depth // 3 * 3
+        if depth % 3 == 0:
+            # A new band: any row of a band not used yet.
+            candidates = np.broadcast_to(np.arange(9), (len(chosen), 9))
+            allowed = (chosen[:, :, None] // 3 != candidates[:, None, :] // 3).all(
+                axis=1
+            )
+        else:
+            band = chosen[:, band_start] // 3
+            candidates = band[:, None] * 3 + np.arange(3)
+            allowed = (chosen[:, band_start:, None] != candidates[:, None, :]).all(
+                axis=1
+            )
+
+        state, pick = np.nonzero(allowed)
+        next_rows = candidates[state, pick]
+        rows = np.take_along_axis(
+            orientations[orientation[state], next_rows], columns[state], axis=1
+        )
+        labels, next_label = labels[state], next_label[state]
+        keys = _relabel_rows(rows, labels, next_label) @ _ROW_WEIGHTS
+        keep = np.flatnonzero(keys == keys.min())
+        chosen = np.concatenate((chosen[state[keep]], next_rows[keep, None]), axis=1)
+        orientation, columns, labels, next_label = (
+            orientation[state[keep]],
+            columns[state[keep]],
+            labels[keep],
+            next_label[keep],
+        )
+        keep = _distinct_states(orientations, chosen, orientation, columns, labels)
+        chosen, orientation, columns, labels, next_label = (
+            chosen[keep],
+            orientation[keep],
+            columns[keep],
+            labels[keep],
+            next_label[keep],
+        )
+
+    # Digits missing from the grid get the remaining labels in increasing order.
+    labels = labels[0].astype(np.int8)
+    missing = np.flatnonzero(labels[1:] == 0) + 1
+    labels[missing] = np.arange(int(next_label[0]), 10)
+    transform = Transform(
+        transpose=bool(orientation[0]),
+        rows=chosen[0],
+        columns=columns[0],
+        labels=labels,
+    )
+    return transform.apply(grid), transform
+
+
+class SolutionCache:
+    """Bounded LRU cache of solutions, keyed on the canonical form of the puzzle.
+
+    Any transformed copy of a cached puzzle is a hit, and its solution comes back in
+    the copy's own orientation.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        """Initialize an empty cache.
+
+        Args:
+            maxsize (int, optional): How many solutions to keep. Defaults to 4096.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._solutions: OrderedDict[bytes, bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._solutions)
+
+    def get(self, grid: np.ndarray) -> np.ndarray | None:
+        """Look up the solution of ``grid``, counting a hit or a miss.
+        Returns:
+            np.ndarray | None: The solution in the orientation of ``grid``, or None.
+        """
+        return self.lookup(grid)[2]
+
+    def put(self, grid: np.ndarray, solution: np.ndarray) -> None:
+        """Store the solution of ``grid``, evicting the least recently used one if full."""
+        self.store(*canonical_form(grid), solution)
+
+    def lookup(
+        self, grid: np.ndarray
+    ) -> tuple[np.ndarray, Transform, np.ndarray | None]:
+        """Like ``get``, but also return the canonical form so a miss can be ``store``-d
+        without canonicalizing again.
+        """
+        canonical, transform = canonical_form(grid)
+        key = canonical.tobytes()
+        solution = self._solutions.get(key)
+        if solution is None:
+            self.misses += 1
+            return canonical, transform, None
+        self.hits += 1
+        self._solutions.move_to_end(key)
+        canonical_solution = np.frombuffer(solution, dtype=np.int8).reshape(9, 9)
+        return canonical, transform, transform.invert(canonical_solution)
+
+    def store(
+        self, canonical: np.ndarray, transform: Transform, solution: np.ndarray
+    ) -> None:
+        """Store a solution given in the orientation ``transform`` maps from."""
+        key = canonical.tobytes()
+        self._solutions[key] = transform.apply(np.asarray(solution, np.int8)).tobytes()
+        self._solutions.move_to_end(key)
+        while len(self._solutions) > self.maxsize:
+            self._solutions.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached solution and reset the counters."""
+        self._solutions.clear()
+        self.hits = self.misses = 0
@@ -0,0 +1,205 @@
+"""Exact cover solving with Knuth's Dancing Links (Algorithm X)."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from math import isqrt
+
+import numpy as np
+
+from core.monitor import SearchMonitor
+
+
+class DancingLinks:
+    """Exact cover matrix stored as a toroidal doubly linked list.
+
+    Node 0 is the root, nodes ``1..num_columns`` are the column headers and every
+    matrix entry after that is a data node. Links live in flat int lists so covering
+    and uncovering a column only rewires list slots.
+    """
+
+    def __init__(self, num_columns: int, rows: Sequence[Sequence[int]]):
+        """Build the matrix.
+
+        Args:
+            num_columns (int): The number of constraint columns.
+            rows (Sequence[Sequence[int]]): For every matrix row, the 0-based columns it covers.
+        """
+        headers = num_columns + 1
+        self.left = [idx - 1 for idx in range(headers)]
+        self.right = [idx + 1 for idx in range(headers)]
+        self.left[0] = num_columns
+        self.right[num_columns] = 0
+        self.up = list(range(headers))
+        self.down = list(range(headers))
+        self.column = list(range(headers))
+        self.size = [0] * headers
+        self.row_of = [-1] * headers
+
+        for row_id, columns in enumerate(rows):
+            first = None
+            for col in columns:
+                header = col + 1
+                node = len(self.column)
+                self.column.append(header)
+                self.row_of.append(row_id)
+                self.up.append(self.up[header])
+                self.down.append(header)
+                self.down[self.up[header]] = node
+                self.up[header] = node
+                self.size[header] += 1
+                if first is None:
+                    first = node
+                    self.left.append(node)
+                    self.right.append(node)
+                else:
+                    self.left.append(self.left[first])
+                    self.right.append(first)
+                    self.right[self.left[first]] = node
+                    self.left[first] = node
+
+    def _cover(self, col: int) -> None:
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, col: int) -> None:
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def _select(self, node: int) -> None:
+        """Cover every other column of the row containing ``node``."""
+        j = self.right[node]
+        while j != node:
+            self._cover(self.column[j])
+            j = self.right[j]
+
+    def _unselect(self, node: int) -> None:
+        j = self.left[node]
+        while j != node:
+            self._uncover(self.column[j])
+            j = self.left[j]
+
+    def _descend(self) -> int:
+        """Cover the column with the fewest rows and return its first row node."""
+        right, size = self.right, self.size
+        best = right[0]
+        best_size = size[best]
+        col = right[best]
+        while col != 0 and best_size > 1:
+            if size[col] < best_size:
+                best, best_size = col, size[col]
+            col = right[col]
+        self._cover(best)
+        return self.down[best]
+
+    def solutions(self, monitor: SearchMonitor | None = None) -> Iterator[list[int]]:
+        """Yield every exact cover as a list of row ids.
+
+        The search is iterative and mutates the links in place, so a matrix supports
+        a single pass; abandoning the generator early leaves it partially covered.
+        Args:
+            monitor (SearchMonitor | None, optional): Ticked on every column chosen; it
+                raises ``SearchInterrupted`` out of the generator. Defaults to None.
+        """
+        if self.right[0] == 0:
+            yield []
+            return
+
+        column, down = self.column, self.down
+        chosen: list[int] = []
+        node = self._descend()
+        while True:
+            col = column[node]
+            if node == col:
+                # Every row of this column has been tried; backtrack.
+                self._uncover(col)
+                if not chosen:
+                    return
+                node = chosen.pop()
+                self._unselect(node)
+                node = down[node]
+                continue
+
+            self._select(node)
+            chosen.append(node)
+            if self.right[0] == 0:
+                if monitor is not None:
+                    monitor.solutions += 1
+                yield [self.row_of[n] for n in chosen]
+                chosen.pop()
+                self._unselect(node)
+                node = down[node]
+                continue
+            if monitor is not None:
+                monitor.tick(len(chosen))
+            node = self._descend()
+
+
+def sudoku_solutions(
+    grid: np.ndarray,
+    candidate_masks: np.ndarray,
+    monitor: SearchMonitor | None = None,
+) -> Iterator[np.ndarray]:
+    """Yield the solutions of an ``N x N`` sudoku by reducing it to exact cover.
+    Args:
+        grid (np.ndarray): The sudoku array, 0 for empty cells.
+        candidate_masks (np.ndarray): Candidate masks of the empty cells (bit ``n - 1`` for ``n``).
+        monitor (SearchMonitor | None, optional): Budget and progress of the search.
+            Defaults to None.
+    Returns:
+        Iterator[np.ndarray]: Every solution as a new array.
+    """
+    size = grid.shape[0]
+    box = isqrt(size)
+    cells = size * size
+    placements: list[tuple[int, int, int]] = []
+    rows: list[tuple[int, int, int, int]] = []
+    for x in range(size):
+        for y in range(size):
+            value = int(grid[x, y])
+            if value:
+                digits = (value,)
+            else:
+                mask = int(candidate_masks[x, y])
+                digits = tuple(n for n in range(1, size + 1) if mask >> (n - 1) & 1)
+            section = x // box * box + y // box
+            for n in digits:
+                placements.append((x, y, n))
+                # Columns: cell filled, number in row, in column and in section.
+                rows.append(
+                    (
+                        x * size + y,
+                        cells + x * size + n - 1,
+                        2 * cells + y * size + n - 1,
+                        3 * cells + section * size + n - 1,
+                    )
+                )
+
+    for chosen in DancingLinks(4 * cells, rows).solutions(monitor):
+        solution = np.array(grid, dtype=np.int8)
+        for row_id in chosen:
+            x, y, n = placements[row_id]
+            solution[x, y] = n
+        yield solution
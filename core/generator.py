@@ -0,0 +1,191 @@
+"""Random puzzle generation with a unique-solution guarantee.
+
+A puzzle starts from a random full grid and loses clues one symmetry orbit at a
+time; an orbit only stays removed if the puzzle keeps exactly one solution.
+Every puzzle is built from its own seed, so a batch is reproducible no matter how
+many processes generate it.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Literal, get_args
+
+import numpy as np
+
+from core.sudoku import SECTION_UNITS, Table, digit_mask
+
+Symmetry = Literal["none", "rotational", "diagonal", "mirror"]
+
+SYMMETRIES: tuple[Symmetry, ...] = get_args(Symmetry)
+
+
+def _symmetric_cell(idx: int, symmetry: Symmetry) -> int:
+    x, y = divmod(idx, 9)
+    if symmetry == "rotational":
+        return (8 - x) * 9 + 8 - y
+    if symmetry == "diagonal":
+        return y * 9 + x
+    if symmetry == "mirror":
+        return x * 9 + 8 - y
+    return idx
+
+
+def symmetry_orbits(symmetry: Symmetry) -> list[tuple[int, ...]]:
+    """Group the 81 flat cell indices into the sets that must be cleared together.
+    Args:
+        symmetry (Symmetry): "none" for single cells, "rotational" for 180 degree turns,
+            "diagonal" for reflection over the main diagonal or "mirror" for left-right.
+    Returns:
+        list[tuple[int, ...]]: Every orbit once, as sorted flat cell indices.
+    """
+    if symmetry not in SYMMETRIES:
+        raise ValueError(f"Unknown clue symmetry: {symmetry!r}")
+    orbits = {tuple(sorted({idx, _symmetric_cell(idx, symmetry)})) for idx in range(81)}
+    return sorted(orbits)
+
+
+def random_full_grid(rng: np.random.Generator) -> np.ndarray:
+    """Build a random solved grid.
+
+    The three diagonal sections don't constrain each other, so they are filled with
+    random permutations and the search completes the rest. Relabelling the digits
+    afterwards hides the search's low-digit-first bias.
+    """
+    table = Table(np.zeros((9, 9), dtype=np.int8))
+    for section in (0, 4, 8):
+        for idx, number in zip(SECTION_UNITS[section], rng.permutation(9) + 1):
+            table.insert_number(int(number), *divmod(int(idx), 9))
+    table.solve(engine="mrv", propagate=False)
+
+    labels = np.concatenate(([0], rng.permutation(9) + 1)).astype(np.int8)
+    return labels[table.sudoku_array]
+
+
+def _has_other_solution(table: Table, x: int, y: int, number: int) -> bool:
+    """Whether the empty cell ``(x, y)`` can hold anything other than ``number``.
+
+    The puzzle was unique before the cell was cleared, so a second solution must
+    differ from the first exactly there; searching for one solution without
+    ``number`` is a cheaper uniqueness check than counting to two.
+    """
+    masks = table.candidate_masks
+    original = masks[x, y]
+    masks[x, y] &= ~np.uint16(digit_mask(number))
+    try:
+        return table.count_solutions(limit=1, propagate=False) > 0
+    finally:
+        masks[x, y] = original
+
+
+def generate_puzzle(
+    seed: int | np.random.SeedSequence | None = None,
+    clues: int = 0,
+    symmetry: Symmetry = "none",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Generate a puzzle with exactly one solution.
+    Args:
+        seed (int | np.random.SeedSequence | None, optional): Seed of the random generator;
+            the same seed gives the same puzzle. Defaults to None.
+        clues (int, optional): Stop removing clues once this many are left. The default
+            of 0 removes as many as possible, leaving a minimal puzzle for the pattern.
+        symmetry (Symmetry, optional): The symmetry of the clue pattern. Defaults to "none".
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The puzzle (0 for empty cells) and its solution.
+    """
+    rng = np.random.default_rng(seed)
+    orbits = symmetry_orbits(symmetry)
+    solution = random_full_grid(rng)
+    table = Table(solution.copy())
+
+    remaining = 81
+    for orbit_idx in rng.permutation(len(orbits)):
+        orbit = orbits[orbit_idx]
+        if remaining - len(orbit) < clues:
+            continue
+
+        cells = [divmod(idx, 9) for idx in orbit]
+        for x, y in cells:
+            table.remove_number(x, y)
+        if any(_has_other_solution(table, x, y, solution[x, y]) for x, y in cells):
+            for x, y in cells:
+                table.insert_number(solution[x, y], x, y)
+            continue
+
+        remaining -= len(orbit)
+        if remaining == clues:
+            break
+
+    return table.sudoku_array.copy(), solution
+
+
+def _generate_chunk(
+    seeds: list[np.random.SeedSequence], clues: int, symmetry: Symmetry
+) -> tuple[np.ndarray, np.ndarray]:
+    pairs = [generate_puzzle(seed, clues, symmetry) for seed in seeds]
+    return np.stack([p for p, _ in pairs]), np.stack([s for _, s in pairs])
+
+
+def iter_puzzles(
+    count: int,
+    seed: int | None = None,
+    clues: int = 0,
+    symmetry: Symmetry = "none",
+    workers: int | None = 1,
+    chunk_size: int = 64,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Generate ``count`` puzzles, yielding ``(puzzles, solutions)`` chunks in order.
+
+    Puzzle ``i`` is generated from the ``i``-th child of ``SeedSequence(seed)``, so the
+    output only depends on ``seed``, not on ``workers`` or ``chunk_size``.
+    Args:
+        count (int): How many puzzles to generate.
+        seed (int | None, optional): The root seed; None draws a fresh one. Defaults to None.
+        clues (int, optional): The target clue count passed to ``generate_puzzle``. Defaults to 0.
+        symmetry (Symmetry, optional): The symmetry of the clue patterns. Defaults to "none".
+        workers (int | None, optional): Worker processes; 1 generates in this process and
+            None uses every core. Defaults to 1.
+        chunk_size (int, optional): How many puzzles each task generates. Defaults to 64.
+    Returns:
+        Iterator[tuple[np.ndarray, np.ndarray]]: ``(n, 9, 9)`` puzzles and solutions per chunk.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(count)
+    chunks = [
+        seeds[start : start + chunk_size] for start in range(0, count, chunk_size)
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield _generate_chunk(chunk, clues, symmetry)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(
+            _generate_chunk,
+            chunks,
+            [clues] * len(chunks),
+            [symmetry] * len(chunks),
+        )
+
+
+def generate_puzzles(
+    count: int,
+    seed: int | None = None,
+    clues: int = 0,
+    symmetry: Symmetry = "none",
+    workers: int | None = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Generate ``count`` puzzles at once; see ``iter_puzzles`` for the arguments.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: ``(count, 9, 9)`` puzzles and their solutions.
+    """
+    chunks = list(iter_puzzles(count, seed, clues, symmetry, workers))
+    if not chunks:
+        empty = np.zeros((0, 9, 9), dtype=np.int8)
+        return empty, empty.copy()
+    return (
+        np.concatenate([puzzles for puzzles, _ in chunks]),
+        np.concatenate([solutions for _, solutions in chunks]),
+    )
@@ -0,0 +1,316 @@
+"""Explainable next steps for a single board.
+
+Rating applies every instance of a technique at once; a hint names one instance
+instead: the cells that form the pattern, the numbers it is about and the rows,
+columns or sections that define it, together with only the candidates that this
+instance removes. Techniques are tried in the order of ``core.rating.LADDER``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.propagation import subset_patterns
+from core.rating import LADDER
+
+UNIT_KINDS = ("row", "column", "section")
+
+# Why each technique of ``core.rating.LADDER`` is valid, as a general rule.
+HINT_EXPLANATIONS = {
+    "hidden_single": "It is the only place left for the number in a row, column or section.",
+    "naked_single": "It is the only number left that fits the cell.",
+    "locked_candidates": "Within a section the number is confined to one row or column (or the "
+    "other way around), so it can't appear elsewhere in that line (or section).",
+    "naked_pair": "Two cells of a unit share the same two candidates, so those numbers "
+    "can't go anywhere else in the unit.",
+    "x_wing": "Two rows restrict the number to the same two columns (or the other way "
+    "around), so the rest of those columns (or rows) can't hold it.",
+    "hidden_pair": "Two numbers can only go in the same two cells of a unit, so those "
+    "cells can't hold anything else.",
+    "naked_triple": "Three cells of a unit only allow three numbers between them, so those "
+    "numbers can't go anywhere else in the unit.",
+    "swordfish": "Three rows restrict the number to the same three columns (or the other "
+    "way around), so the rest of those columns (or rows) can't hold it.",
+    "hidden_triple": "Three numbers can only go in the same three cells of a unit, so those "
+    "cells can't hold anything else.",
+    "naked_quad": "Four cells of a unit only allow four numbers between them, so those "
+    "numbers can't go anywhere else in the unit.",
+    "jellyfish": "Four rows restrict the number to the same four columns (or the other way "
+    "around), so the rest of those columns (or rows) can't hold it.",
+    "hidden_quad": "Four numbers can only go in the same four cells of a unit, so those "
+    "cells can't hold anything else.",
+}
+
+_SUBSET_SIZES = {"pair": 2, "triple": 3, "quad": 4}
+_FISH_SIZES = {"x_wing": 2, "swordfish": 3, "jellyfish": 4}
+
+Cell = tuple[int, int]
+Unit = tuple[str, int]
+
+
+@dataclass(frozen=True, slots=True)
+class Hint:
+    """The next logical step found by ``Table.hint``."""
+
+    technique: str
+    # Every cell the step changes, as (x, y).
+    cells: tuple[Cell, ...]
+    # Candidates the step removes, as (x, y, number).
+    eliminations: tuple[tuple[int, int, int], ...]
+    # Numbers the step fills in, as (x, y, number).
+    placements: tuple[tuple[int, int, int], ...] = ()
+    # The cells that form the pattern, as (x, y).
+    pattern: tuple[Cell, ...] = ()
+    # The numbers the pattern is about.
+    digits: tuple[int, ...] = ()
+    # The units that define the pattern, as (kind, index) with a kind of ``UNIT_KINDS``.
+    # Locked candidates list the unit confining the number, then the one it leaves;
+    # fish list their base lines, then their cover lines.
+    units: tuple[Unit, ...] = ()
+
+    @property
+    def rule(self) -> str:
+        """Why the technique is valid in general, in words."""
+        return HINT_EXPLANATIONS.get(self.technique, "")
+
+    @property
+    def explanation(self) -> str:
+        """Why this step is valid, in words naming its cells, numbers and units."""
+        technique, units = self.technique, self.units
+        cells = _join([_cell_name(cell) for cell in self.pattern])
+        digits = _join([str(digit) for digit in self.digits])
+        if not self.pattern:
+            return self.rule
+        if technique == "naked_single":
+            return f"{cells} has no candidate left but {digits}."
+        if technique == "hidden_single":
+            return f"{digits} can only go in {cells} within {_unit_name(units[0])}."
+        if technique == "locked_candidates":
+            inside, line = _unit_name(units[0]), _unit_name(units[1])
+            return (
+                f"Within {inside}, {digits} can only go in {line} ({cells}), so it "
+                f"can't go anywhere else in {line}."
+            )
+        if technique in _FISH_SIZES:
+            size = _FISH_SIZES[technique]
+            base = _join([_unit_name(unit) for unit in units[:size]])
+            cover = _join([_unit_name(unit) for unit in units[size:]])
+            return (
+                f"In {base}, {digits} can only go in {cover}, so the rest of "
+                f"{cover} can't hold it."
+            )
+        unit = _unit_name(units[0])
+        if technique.startswith("naked_"):
+            return (
+                f"{cells} only allow {digits} between them, so {digits} can't go "
+                f"anywhere else in {unit}."
+            )
+        return (
+            f"{digits} can only go in {cells} within {unit}, so those cells can't "
+            "hold anything else."
+        )
+
+
+def _cell_name(cell: Cell) -> str:
+    return f"r{cell[0] + 1}c{cell[1] + 1}"
+
+
+def _unit_name(unit: Unit) -> str:
+    return f"{unit[0]} {unit[1] + 1}"
+
+
+def _join(names: list[str]) -> str:
+    if len(names) <= 1:
+        return "".join(names)
+    return ", ".join(names[:-1]) + " and " + names[-1]
+
+
+class _Board:
+    """The open candidates of one board, viewed per unit."""
+
+    def __init__(self, cube: np.ndarray, empty: np.ndarray, units: np.ndarray):
+        self.size = cube.shape[-1]
+        # Filled cells hold no candidates, so they never take part in a pattern.
+        self.flat = (cube & empty[..., None]).reshape(-1, self.size)
+        self.units = units
+        # ``(3N, N cells, N digits)`` candidates of every unit.
+        self.unit_cube = self.flat[units]
+        self.cell_section = np.empty(self.size * self.size, dtype=np.intp)
+        self.cell_section[units[2 * self.size :]] = np.arange(self.size)[:, None]
+
+    def cell(self, idx: int) -> Cell:
+        return divmod(int(idx), self.size)
+
+    def unit(self, unit: int) -> Unit:
+        kind, index = divmod(unit, self.size)
+        return UNIT_KINDS[kind], index
+
+    def hint(
+        self,
+        technique: str,
+        removed: np.ndarray,
+        pattern: np.ndarray,
+        digits: np.ndarray,
+        units: list[int],
+        placements: tuple[tuple[int, int, int], ...] = (),
+    ) -> Hint:
+        """Build a hint from flat ``(cells, N)`` eliminations and flat pattern cells."""
+        eliminations = tuple(
+            (*self.cell(idx), int(digit) + 1) for idx, digit in np.argwhere(removed)
+        )
+        changed = sorted({(x, y) for x, y, _digit in eliminations})
+        changed += [(x, y) for x, y, _number in placements if (x, y) not in changed]
+        return Hint(
+            technique,
+            tuple(changed),
+            eliminations,
+            placements,
+            pattern=tuple(self.cell(idx) for idx in pattern),
+            digits=tuple(int(digit) + 1 for digit in digits),
+            units=tuple(self.unit(unit) for unit in units),
+        )
+
+    def naked_single(self) -> Hint | None:
+        singles = np.flatnonzero(self.flat.sum(axis=-1) == 1)
+        if not len(singles):
+            return None
+        idx = singles[0]
+        digit = int(np.argmax(self.flat[idx]))
+        placement = ((*self.cell(idx), digit + 1),)
+        removed = np.zeros_like(self.flat)
+        return self.hint("naked_single", removed, [idx], [digit], [], placement)
+
+    def hidden_single(self) -> Hint | None:
+        # The only place of a digit in a unit, in a cell that still has other candidates.
+        places = self.unit_cube.sum(axis=-2)
+        for unit, digit in np.argwhere(places == 1):
+            position = int(np.argmax(self.unit_cube[unit, :, digit]))
+            idx = self.units[unit, position]
+            if self.flat[idx].sum() > 1:
+                removed = np.zeros_like(self.flat)
+                removed[idx] = self.flat[idx]
+                removed[idx, digit] = False
+                placement = ((*self.cell(idx), int(digit) + 1),)
+                return self.hint(
+                    "hidden_single", removed, [idx], [digit], [unit], placement
+                )
+        return None
+
+    def locked_candidates(self) -> Hint | None:
+        size = self.size
+        sections = range(2 * size, 3 * size)
+        for digit in range(size):
+            has = self.flat[:, digit]
+            # Pointing: within a section the digit sits in one row (column) only.
+            for section in sections:
+                cells = self.units[section][has[self.units[section]]]
+                for kind, lines in ((0, cells // size), (1, cells % size)):
+                    if len(cells) and (lines == lines[0]).all():
+                        line = kind * size + int(lines[0])
+                        outside = self.units[line]
+                        outside = outside[
+                            self.cell_section[outside] != section - 2 * size
+                        ]
+                        hint = self._locked(digit, cells, outside, [section, line])
+                        if hint is not None:
+                            return hint
+            # Claiming: within a row (column) the digit sits in one section only.
+            for line in range(2 * size):
+                cells = self.units[line][has[self.units[line]]]
+                owners = self.cell_section[cells]
+                if len(cells) and (owners == owners[0]).all():
+                    section = 2 * size + int(owners[0])
+                    outside = np.setdiff1d(self.units[section], self.units[line])
+                    hint = self._locked(digit, cells, outside, [line, section])
+                    if hint is not None:
+                        return hint
+        return None
+
+    def _locked(
+        self, digit: int, cells: np.ndarray, outside: np.ndarray, units: list[int]
+    ) -> Hint | None:
+        targets = outside[self.flat[outside, digit]]
+        if not len(targets):
+            return None
+        removed = np.zeros_like(self.flat)
+        removed[targets, digit] = True
+        return self.hint("locked_candidates", removed, cells, [digit], units)
+
+    def subset(self, technique: str, size: int, hidden: bool) -> Hint | None:
+        # Naked: cells x digits of each unit; hidden: digits x cells.
+        matrix = self.unit_cube.swapaxes(-1, -2) if hidden else self.unit_cube
+        combos, found, union = subset_patterns(matrix, size)
+        for unit, combo in np.argwhere(found):
+            members = np.zeros(self.size, dtype=bool)
+            members[combos[combo]] = True
+            taken = union[unit, combo]
+            if hidden:
+                # The cells the digits are confined to lose every other digit.
+                positions, digits = np.flatnonzero(taken), combos[combo]
+                removed_cells = self.unit_cube[unit] & taken[:, None] & ~members
+            else:
+                # The digits leave the other cells of the unit.
+                positions, digits = combos[combo], np.flatnonzero(taken)
+                removed_cells = self.unit_cube[unit] & ~members[:, None] & taken
+            if removed_cells.any():
+                removed = np.zeros_like(self.flat)
+                removed[self.units[unit]] = removed_cells
+                pattern = self.units[unit, positions]
+                return self.hint(technique, removed, pattern, digits, [unit])
+        return None
+
+    def fish(self, technique: str, size: int) -> Hint | None:
+        # ``(N digits, N rows, N columns)``; columns as base lines use the transpose.
+        by_digit = self.flat.reshape(self.size, self.size, self.size).transpose(2, 0, 1)
+        for base_kind, lines in ((0, by_digit), (1, by_digit.swapaxes(-1, -2))):
+            combos, found, union = subset_patterns(lines, size)
+            for digit, combo in np.argwhere(found):
+                base = np.zeros(self.size, dtype=bool)
+                base[combos[combo]] = True
+                cover = union[digit, combo]
+                removed_lines = lines[digit] & ~base[:, None] & cover
+                if not removed_lines.any():
+                    continue
+                pattern_lines = lines[digit] & base[:, None] & cover
+                if base_kind == 1:
+                    removed_lines, pattern_lines = removed_lines.T, pattern_lines.T
+                removed = np.zeros_like(self.flat)
+                removed[:, digit] = removed_lines.ravel()
+                cover_kind = 1 - base_kind
+                units = [base_kind * self.size + int(line) for line in combos[combo]]
+                units += [
+                    cover_kind * self.size + int(line) for line in np.flatnonzero(cover)
+                ]
+                pattern = np.flatnonzero(pattern_lines.ravel())
+                return self.hint(technique, removed, pattern, [digit], units)
+        return None
+
+
+def find_hint(cube: np.ndarray, empty: np.ndarray, units: np.ndarray) -> Hint | None:
+    """Find the first instance of the cheapest technique that changes the board.
+    Args:
+        cube (np.ndarray): The ``(N, N, N)`` candidate cube of the board.
+        empty (np.ndarray): The ``(N, N)`` mask of its empty cells.
+        units (np.ndarray): The ``(3N, N)`` flat cells of its rows, columns and sections,
+            as in ``Geometry.units``.
+    Returns:
+        Hint | None: The step, or None if no technique applies.
+    """
+    board = _Board(cube, empty, units)
+    for name, _technique, _rating in LADDER:
+        kind, _, subset = name.partition("_")
+        if name == "naked_single":
+            hint = board.naked_single()
+        elif name == "hidden_single":
+            hint = board.hidden_single()
+        elif name == "locked_candidates":
+            hint = board.locked_candidates()
+        elif name in _FISH_SIZES:
+            hint = board.fish(name, _FISH_SIZES[name])
+        else:
+            hint = board.subset(name, _SUBSET_SIZES[subset], hidden=kind == "hidden")
+        if hint is not None:
+            return hint
+    return None
@@ -0,0 +1,106 @@
+"""Time and node budgets, cancellation and progress reports for the solver searches.
+
+A ``SearchMonitor`` is handed to a search, which calls ``tick`` once per node. Every
+``interval`` nodes the monitor looks at the clock, the node budget and the
+cancellation event and reports progress; in between a tick is a single comparison,
+so checking costs next to nothing next to the work of a node.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import monotonic
+
+
+class SearchInterrupted(Exception):
+    """Raised out of a search when its deadline has passed or it was cancelled."""
+
+
+@dataclass(frozen=True, slots=True)
+class SearchProgress:
+    """A snapshot of a running search, as passed to the progress callback."""
+
+    nodes: int
+    depth: int
+    solutions: int
+    elapsed: float
+
+
+class SearchMonitor:
+    """Caps how long a search may run and reports how far it got."""
+
+    def __init__(
+        self,
+        timeout: float | None = None,
+        deadline: float | None = None,
+        cancel: threading.Event | None = None,
+        progress: Callable[[SearchProgress], None] | None = None,
+        interval: int = 1024,
+        max_nodes: int | None = None,
+    ):
+        """Set up the budget; the clock starts now.
+
+        Args:
+            timeout (float | None, optional): Seconds the search may run. Defaults to None.
+            deadline (float | None, optional): A ``time.monotonic()`` value to stop at; the
+                earlier of this and ``timeout`` applies. Defaults to None.
+            cancel (threading.Event | None, optional): Stops the search once set, e.g. from
+                another thread. Defaults to None.
+            progress (Callable[[SearchProgress], None] | None, optional): Called every
+                ``interval`` nodes and once more when the search ends. Defaults to None.
+            interval (int, optional): How many nodes to explore between checks. Defaults to 1024.
+            max_nodes (int | None, optional): Stop once this many nodes have been explored,
+                as seen at the next check. Defaults to None.
+        """
+        if interval < 1:
+            raise ValueError(f"Check interval must be positive, got {interval}")
+        self.start = monotonic()
+        if timeout is not None:
+            deadline = (
+                self.start + timeout
+                if deadline is None
+                else min(deadline, self.start + timeout)
+            )
+        self.deadline = deadline
+        self.cancel = cancel
+        self.progress = progress
+        self.interval = interval
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.solutions = 0
+        self.interrupted = False
+        self._next_check = interval
+
+    @property
+    def elapsed(self) -> float:
+        return monotonic() - self.start
+
+    def tick(self, depth: int) -> None:
+        """Count a node at ``depth`` and, every ``interval`` nodes, check the budget.
+        Raises:
+            SearchInterrupted: If the deadline has passed or the search was cancelled.
+        """
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._next_check += self.interval
+            self.check(depth)
+
+    def check(self, depth: int = 0) -> None:
+        """Raise ``SearchInterrupted`` if the search has to stop, else report progress."""
+        if (
+            (self.cancel is not None and self.cancel.is_set())
+            or (self.deadline is not None and monotonic() >= self.deadline)
+            or (self.max_nodes is not None and self.nodes >= self.max_nodes)
+        ):
+            self.interrupted = True
+            raise SearchInterrupted
+        self.report(depth)
+
+    def report(self, depth: int = 0) -> None:
+        """Pass the current progress to the callback, if there is one."""
+        if self.progress is not None:
+            self.progress(
+                SearchProgress(self.nodes, depth, self.solutions, self.elapsed)
+            )
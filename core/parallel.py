@@ -0,0 +1,250 @@
+"""Count or list every solution of a board on all cores.
+
+The search tree is split breadth-first, always branching on the cell with the
+fewest candidates, into a few dozen independent subtrees per worker. Each subtree
+is then searched to the bottom by an ``IterativeSearch`` in a process pool; workers
+pick up the next subtree as soon as they finish one, so a few deep subtrees don't
+leave the other cores idle. When listing, a subtree is searched in tasks of at most
+``SOLUTIONS_PER_BATCH`` solutions, each resuming the saved search state of the one
+before, so solutions stream out while the subtree is still being searched.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from multiprocessing.synchronize import Event
+from typing import Any
+
+import numpy as np
+
+from core.propagation import propagate as propagate_cube
+from core.search import IterativeSearch
+from core.sudoku import Table, cube_to_grid, grid_geometry
+
+# Subtrees handed out per worker: enough to even out their uneven sizes.
+SUBTREES_PER_WORKER = 32
+# Most solutions a listing task sends back; the rest of its subtree is a new task.
+SOLUTIONS_PER_BATCH = 1024
+# Listing tasks in flight per worker, bounding the solutions waiting to be consumed.
+_TASKS_PER_WORKER = 2
+# Nodes a worker searches between looks at the stop event.
+_STOP_CHECK_NODES = 4096
+
+Subproblem = tuple[np.ndarray, np.ndarray]
+
+
+def split_subproblems(
+    grid: np.ndarray, candidate_masks: np.ndarray, target: int
+) -> list[Subproblem]:
+    """Branch on the most constrained cells until there are at least ``target`` subtrees.
+
+    Every candidate of the branching cell leaves its peers, and branches that leave
+    a cell without candidates are dropped. Expanding level by level keeps the
+    subtrees of each branch together and in candidate order.
+    Args:
+        grid (np.ndarray): An ``N x N`` grid, 0 for empty cells.
+        candidate_masks (np.ndarray): Candidate masks of the empty cells.
+        target (int): How many subtrees to aim for; fewer come back if the tree is smaller.
+    Returns:
+        list[Subproblem]: ``(grid, candidate_masks)`` of every subtree.
+    """
+    geometry = grid_geometry(grid)
+    peers = geometry.peer_lists
+    frontier = [
+        (
+            np.asarray(grid).ravel().tolist(),
+            np.where(np.asarray(grid) == 0, candidate_masks, 0).ravel().tolist(),
+        )
+    ]
+    while len(frontier) < target:
+        expanded = []
+        branched = False
+        for values, candidates in frontier:
+            empty = [idx for idx, value in enumerate(values) if not value]
+            if not empty:
+                expanded.append((values, candidates))
+                continue
+            branched = True
+            idx = min(empty, key=lambda cell: candidates[cell].bit_count())
+            free = candidates[idx]
+            while free:
+                bit = free & -free
+                free ^= bit
+                child_values, child_candidates = values.copy(), candidates.copy()
+                child_values[idx] = bit.bit_length()
+                child_candidates[idx] = 0
+                for peer in peers[idx]:
+                    if not child_values[peer] and child_candidates[peer] & bit:
+                        child_candidates[peer] ^= bit
+                        if not child_candidates[peer]:
+                            break
+                else:
+                    expanded.append((child_values, child_candidates))
+        frontier = expanded
+        if not branched:
+            break
+
+    dtype, shape = geometry.mask_dtype, np.shape(grid)
+    return [
+        (
+            np.array(values, dtype=np.int8).reshape(shape),
+            np.array(candidates, dtype=dtype).reshape(shape),
+        )
+        for values, candidates in frontier
+    ]
+
+
+# Set by the parent once the results are no longer wanted; each worker process gets
+# it through the pool initializer.
+_stop: Event | None = None
+
+
+def _init_worker(stop: Event) -> None:
+    global _stop
+    _stop = stop
+
+
+def _stopped() -> bool:
+    return _stop is not None and _stop.is_set()
+
+
+def _count_subtree(subproblem: Subproblem, limit: int | None) -> int:
+    search = IterativeSearch(*subproblem)
+    while not search.finished and not _stopped():
+        remaining = None if limit is None else limit - search.solutions_found
+        if remaining is not None and remaining <= 0:
+            break
+        search.step(_STOP_CHECK_NODES, remaining, collect=False)
+    return search.solutions_found
+
+
+def _list_subtree(
+    task: Subproblem | dict[str, Any],
+) -> tuple[np.ndarray, dict[str, Any] | None]:
+    """Search a subtree, or resume a saved search, up to ``SOLUTIONS_PER_BATCH``
+    solutions.
+    Returns:
+        tuple[np.ndarray, dict[str, Any] | None]: The ``(n, N, N)`` solutions found and
+            the search state to carry on from, None once the subtree is done.
+    """
+    if isinstance(task, dict):
+        search = IterativeSearch.from_state(task)
+    else:
+        search = IterativeSearch(*task)
+    solutions: list[np.ndarray] = []
+    while (
+        not search.finished and not _stopped() and len(solutions) < SOLUTIONS_PER_BATCH
+    ):
+        solutions.extend(
+            search.step(_STOP_CHECK_NODES, SOLUTIONS_PER_BATCH - len(solutions))
+        )
+    state = None if search.finished else search.state()
+    if not solutions:
+        return np.zeros((0, search.size, search.size), dtype=np.int8), state
+    return np.stack(solutions), state
+
+
+def _executor(workers: int, stop: Event) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(stop,)
+    )
+
+
+def _abandon(executor: ProcessPoolExecutor, stop: Event) -> None:
+    """Return without waiting for the subtrees still being searched or queued."""
+    stop.set()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _subproblems(table: Table, propagate: bool, workers: int) -> list[Subproblem]:
+    grid, masks = table.sudoku_array, table.candidate_masks
+    if propagate:
+        cube = table.candidate_cube()
+        if not propagate_cube(cube):
+            return []
+        grid, masks = cube_to_grid(cube)
+    return split_subproblems(grid, masks, workers * SUBTREES_PER_WORKER)
+
+
+def count_solutions_parallel(
+    table: Table,
+    limit: int | None = None,
+    propagate: bool = True,
+    workers: int | None = None,
+) -> int:
+    """Count the solutions of a table across processes, without changing it.
+    Args:
+        table (Table): The table to count the solutions of.
+        limit (int | None, optional): Stop once this many are found. None counts them all.
+            Defaults to None.
+        propagate (bool, optional): Whether to run the logical techniques first.
+            Defaults to True.
+        workers (int | None, optional): Worker processes; None uses every core.
+    Returns:
+        int: The number of solutions, at most ``limit``.
+    """
+    workers = workers or os.cpu_count() or 1
+    subproblems = _subproblems(table, propagate, workers)
+    total = 0
+    stop = multiprocessing.Event()
+    executor = _executor(workers, stop)
+    try:
+        pending = {
+            executor.submit(_count_subtree, subproblem, limit)
+            for subproblem in subproblems
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            total += sum(future.result() for future in done)
+            if limit is not None and total >= limit:
+                return limit
+    finally:
+        # On reaching the limit (or an error) the other subtrees are not waited for.
+        _abandon(executor, stop)
+    return total
+
+
+def iter_solutions_parallel(
+    table: Table, propagate: bool = True, workers: int | None = None
+) -> Iterator[np.ndarray]:
+    """Yield every solution of a table, searched across processes.
+
+    Solutions come in ``(n, N, N)`` batches of at most ``SOLUTIONS_PER_BATCH``, in the
+    order the workers find them. At most two tasks per worker are in flight, so
+    the solutions waiting to be consumed stay bounded; once the caller stops
+    iterating, the workers stop searching.
+    Args:
+        table (Table): The table to enumerate the solutions of; it is not changed.
+        propagate (bool, optional): Whether to run the logical techniques first.
+            Defaults to True.
+        workers (int | None, optional): Worker processes; None uses every core.
+    Returns:
+        Iterator[np.ndarray]: Batches of solutions.
+    """
+    workers = workers or os.cpu_count() or 1
+    subproblems = _subproblems(table, propagate, workers)
+    stop = multiprocessing.Event()
+    executor = _executor(workers, stop)
+    try:
+        queued = iter(subproblems)
+        pending: set[Future[tuple[np.ndarray, dict[str, Any] | None]]] = {
+            executor.submit(_list_subtree, subproblem)
+            for subproblem in islice(queued, workers * _TASKS_PER_WORKER)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                solutions, state = future.result()
+                # The rest of the subtree goes first, keeping few subtrees open.
+                task = state if state is not None else next(queued, None)
+                if task is not None:
+                    pending.add(executor.submit(_list_subtree, task))
+                if len(solutions):
+                    yield solutions
+    finally:
+        # Also reached when the caller stops iterating early.
+        _abandon(executor, stop)
@@ -0,0 +1,187 @@
+"""Race several solving strategies in worker processes and keep the fastest.
+
+A puzzle that sends row-major backtracking into a pathological search is often
+trivial for MRV or exact cover, and the other way round; a randomly shuffled copy
+of the puzzle can dodge a bad branching order too. A ``Portfolio`` starts one
+process per strategy, takes the first answer and terminates the rest, so the
+latency of a hard puzzle is that of its best strategy (plus a process start).
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+from collections import Counter
+from dataclasses import dataclass
+from time import monotonic
+
+import numpy as np
+
+from core.canonical import random_transform
+from core.monitor import SearchInterrupted, SearchMonitor
+from core.sudoku import Engine, Table, grid_geometry
+
+# How often (s) a race looks at the monitor and at workers that died silently.
+_POLL_INTERVAL = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class Strategy:
+    """One way of solving a puzzle."""
+
+    name: str
+    engine: Engine
+    propagate: bool = True
+    # Solve a randomly relabelled, transposed and permuted copy of the puzzle, which
+    # changes the order the search meets cells and digits in; None solves it as is.
+    shuffle_seed: int | None = None
+
+
+DEFAULT_STRATEGIES: tuple[Strategy, ...] = (
+    Strategy("mrv", "mrv"),
+    Strategy("dlx", "dlx"),
+    Strategy("backtrack", "backtrack"),
+    Strategy("mrv-shuffled", "mrv", shuffle_seed=1),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PortfolioResult:
+    """The outcome of one race."""
+
+    # The strategy that answered first, None if none did before the deadline.
+    winner: str | None
+    # Its solution, None if the puzzle has none (or nobody answered).
+    solution: np.ndarray | None
+    elapsed: float
+
+
+def _run_strategy(
+    strategy: Strategy, grid: np.ndarray, results: multiprocessing.Queue
+) -> None:
+    """Worker process: solve ``grid`` one way and post ``(name, solution | None, ok)``,
+    with ``ok`` False if the strategy failed rather than finding no solution.
+    """
+    try:
+        transform = None
+        if strategy.shuffle_seed is not None:
+            box = grid_geometry(grid).box
+            transform = random_transform(strategy.shuffle_seed, box)
+            grid = transform.apply(grid)
+        table = Table(grid)
+        table.solve(engine=strategy.engine, propagate=strategy.propagate)
+        solution = table.solutions[0] if table.solutions else None
+        if solution is not None and transform is not None:
+            solution = transform.invert(solution)
+    except Exception:
+        results.put((strategy.name, None, False))
+        raise
+    results.put((strategy.name, solution, True))
+
+
+class Portfolio:
+    """A set of strategies to race, and how often each of them won."""
+
+    def __init__(self, strategies: tuple[Strategy, ...] = DEFAULT_STRATEGIES):
+        """Set up the portfolio.
+
+        Args:
+            strategies (tuple[Strategy, ...], optional): The strategies to race, one process
+                each. Defaults to DEFAULT_STRATEGIES.
+        """
+        if not strategies:
+            raise ValueError("A portfolio needs at least one strategy")
+        names = [strategy.name for strategy in strategies]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Strategy names must be unique: {names}")
+        self.strategies = strategies
+        # Races won per strategy name, to see which default would serve best.
+        self.wins: Counter[str] = Counter()
+        self.last: PortfolioResult | None = None
+
+    def race(
+        self,
+        grid: np.ndarray,
+        timeout: float | None = None,
+        monitor: SearchMonitor | None = None,
+    ) -> PortfolioResult:
+        """Solve ``grid`` with every strategy at once and return the first answer.
+
+        Every strategy searches completely, so the first answer is final, whether it
+        is a solution or that there is none.
+        Args:
+            grid (np.ndarray): The puzzle, 0 for empty cells.
+            timeout (float | None, optional): Give up after this many seconds. Defaults to None.
+            monitor (SearchMonitor | None, optional): Also give up at its deadline or once it
+                is cancelled; it gets a progress report every poll. Defaults to None.
+        Returns:
+            PortfolioResult: The winner and its solution; ``winner`` is None on timeout or
+                cancellation.
+        Raises:
+            RuntimeError: If every strategy failed.
+        """
+        start = monotonic()
+        deadline = None if timeout is None else start + timeout
+        if monitor is not None and monitor.deadline is not None:
+            deadline = (
+                monitor.deadline
+                if deadline is None
+                else min(deadline, monitor.deadline)
+            )
+        context = multiprocessing.get_context()
+        results = context.Queue()
+        grid = np.array(grid, dtype=np.int8)
+        workers = [
+            context.Process(
+                target=_run_strategy, args=(strategy, grid, results), daemon=True
+            )
+            for strategy in self.strategies
+        ]
+        for worker in workers:
+            worker.start()
+        winner, solution = None, None
+        failed = 0
+        try:
+            while failed < len(workers):
+                # Wake up regularly: a cancel, a deadline or workers that all died
+                # without posting (e.g. killed) must not leave the race waiting.
+                wait = _POLL_INTERVAL
+                if deadline is not None:
+                    wait = min(wait, max(deadline - monotonic(), 0.0))
+                try:
+                    name, answer, ok = results.get(timeout=wait)
+                except queue.Empty:
+                    if deadline is not None and monotonic() >= deadline:
+                        break
+                    if monitor is not None:
+                        monitor.check()
+                    if not any(worker.is_alive() for worker in workers):
+                        # Their last posts are flushed before they exit; one more
+                        # empty wait means nobody is left to answer.
+                        try:
+                            name, answer, ok = results.get(timeout=_POLL_INTERVAL)
+                        except queue.Empty:
+                            failed = len(workers)
+                            break
+                    else:
+                        continue
+                if ok:
+                    winner, solution = name, answer
+                    break
+                failed += 1
+        except SearchInterrupted:
+            pass
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+            for worker in workers:
+                worker.join()
+            results.close()
+
+        if failed == len(workers):
+            raise RuntimeError("Every strategy of the portfolio failed")
+        if winner is not None:
+            self.wins[winner] += 1
+        self.last = PortfolioResult(winner, solution, monotonic() - start)
+        return self.last
@@ -0,0 +1,207 @@
+"""Vectorized logical propagation over boolean candidate cubes.
+
+A candidate cube has shape ``(..., N, N, N)`` for an ``N x N`` sudoku and is indexed
+``[row, column, digit - 1]``; leading axes hold independent boards. Every technique
+takes a cube and returns a cube of the same shape marking the candidates it can
+eliminate, computed for whole rows, columns and boxes at once.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from functools import cache
+from itertools import combinations
+from math import isqrt
+
+import numpy as np
+
+Technique = Callable[[np.ndarray], np.ndarray]
+
+
+def _box_size(cube: np.ndarray) -> int:
+    return isqrt(cube.shape[-1])
+
+
+def to_units(cube: np.ndarray) -> np.ndarray:
+    """Stack the rows, columns and boxes of ``cube`` as ``(..., 3N, N cells, N digits)``."""
+    size = cube.shape[-1]
+    box = _box_size(cube)
+    lead = cube.shape[:-3]
+    columns = np.swapaxes(cube, -3, -2)
+    boxes = (
+        cube.reshape(*lead, box, box, box, box, size)
+        .swapaxes(-4, -3)
+        .reshape(*lead, size, size, size)
+    )
+    return np.concatenate((cube, columns, boxes), axis=-3)
+
+
+def from_units(units: np.ndarray) -> np.ndarray:
+    """Fold a ``to_units`` shaped array back onto the grid, OR-ing the three views."""
+    size = units.shape[-1]
+    box = isqrt(size)
+    lead = units.shape[:-3]
+    rows = units[..., :size, :, :]
+    columns = np.swapaxes(units[..., size : 2 * size, :, :], -3, -2)
+    boxes = (
+        units[..., 2 * size :, :, :]
+        .reshape(*lead, box, box, box, box, size)
+        .swapaxes(-4, -3)
+        .reshape(*lead, size, size, size)
+    )
+    return rows | columns | boxes
+
+
+@cache
+def _combination_index(items: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return every ``size``-combination of ``items`` and its complement membership.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: ``(K, size)`` item indices and an ``(items, K)``
+            float matrix that is 1 where the item is *not* part of the combination.
+    """
+    combos = np.array(list(combinations(range(items), size)), dtype=np.intp)
+    outside = np.ones((items, len(combos)), dtype=np.float32)
+    outside[combos, np.arange(len(combos))[:, None]] = 0
+    return combos, outside
+
+
+def subset_patterns(
+    matrix: np.ndarray, size: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Find the ``size`` items along ``A`` of ``(..., U, A, B)`` boolean matrices that
+    together only allow ``size`` values along ``B`` (each item allowing at least one).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The ``(K, size)`` item combinations,
+            ``(..., U, K)`` whether each of them is such a subset and the ``(..., U, K, B)``
+            values it allows.
+    """
+    combos, _outside = _combination_index(matrix.shape[-2], size)
+    chosen = matrix[..., combos, :]
+    union = chosen.any(axis=-2)
+    found = (union.sum(axis=-1) == size) & chosen.any(axis=-1).all(axis=-1)
+    return combos, found, union
+
+
+def _subset_eliminations(matrix: np.ndarray, size: int) -> np.ndarray:
+    """Naked-subset rule on ``(..., U, A, B)`` boolean matrices.
+
+    When ``size`` items along ``A`` together only allow ``size`` values along ``B``,
+    those values are taken and can be removed from every other item in the group.
+    Cells x digits gives naked subsets, digits x cells hidden subsets and
+    rows x columns of one digit gives fish.
+    """
+    _combos, outside = _combination_index(matrix.shape[-2], size)
+    _combos, found, union = subset_patterns(matrix, size)
+    taken = (union & found[..., None]).astype(np.float32)
+    return (np.matmul(outside, taken) > 0) & matrix
+
+
+def naked_subsets(cube: np.ndarray, size: int) -> np.ndarray:
+    """Eliminations from ``size`` cells of a unit that share exactly ``size`` candidates."""
+    return from_units(_subset_eliminations(to_units(cube), size))
+
+
+def hidden_subsets(cube: np.ndarray, size: int) -> np.ndarray:
+    """Eliminations from ``size`` digits confined to exactly ``size`` cells of a unit."""
+    units = np.swapaxes(to_units(cube), -1, -2)
+    return from_units(np.swapaxes(_subset_eliminations(units, size), -1, -2))
+
+
+def naked_singles(cube: np.ndarray) -> np.ndarray:
+    """Remove the digit of every solved cell from its row, column and box."""
+    units = to_units(cube)
+    solved = units & (units.sum(axis=-1, keepdims=True) == 1)
+    placed = solved.any(axis=-2, keepdims=True)
+    return from_units(units & placed & ~solved)
+
+
+def hidden_singles(cube: np.ndarray) -> np.ndarray:
+    """Remove the other candidates of a cell that is the only place for a digit in a unit."""
+    units = to_units(cube)
+    hidden = units & (units.sum(axis=-2, keepdims=True) == 1)
+    return from_units(units & hidden.any(axis=-1, keepdims=True) & ~hidden)
+
+
+def _line_box_eliminations(cube: np.ndarray) -> np.ndarray:
+    """Pointing and claiming along rows; columns are handled on the transposed cube."""
+    size = cube.shape[-1]
+    box = _box_size(cube)
+    lead = cube.shape[:-3]
+    # (..., box row, row in band, box column, column in stack, digit)
+    split = cube.reshape(*lead, box, box, box, box, size)
+    in_box_row = split.any(axis=-2)
+
+    # Pointing: a box only has the digit in one row, so the rest of that row loses it.
+    pointing = in_box_row & (in_box_row.sum(axis=-3, keepdims=True) == 1)
+    other_boxes = pointing.sum(axis=-2, keepdims=True) - pointing > 0
+
+    # Claiming: a row only has the digit in one box, so the rest of that box loses it.
+    claiming = in_box_row & (in_box_row.sum(axis=-2, keepdims=True) == 1)
+    other_rows = claiming.sum(axis=-3, keepdims=True) - claiming > 0
+
+    eliminations = split & (other_boxes | other_rows)[..., None, :]
+    return eliminations.reshape(cube.shape)
+
+
+def locked_candidates(cube: np.ndarray) -> np.ndarray:
+    """Box-line reduction (pointing and claiming) in both directions."""
+    columns = np.swapaxes(_line_box_eliminations(np.swapaxes(cube, -3, -2)), -3, -2)
+    return _line_box_eliminations(cube) | columns
+
+
+def fish(cube: np.ndarray, size: int) -> np.ndarray:
+    """Basic fish of ``size`` lines per digit (2 for X-Wing, 3 for Swordfish)."""
+    by_digit = np.moveaxis(cube, -1, -3)
+    rows = _subset_eliminations(by_digit, size)
+    columns = np.swapaxes(
+        _subset_eliminations(np.swapaxes(by_digit, -1, -2), size), -1, -2
+    )
+    return np.moveaxis(rows | columns, -3, -1)
+
+
+def x_wing(cube: np.ndarray) -> np.ndarray:
+    """Two rows (or columns) restricting a digit to the same two columns (or rows)."""
+    return fish(cube, 2)
+
+
+# Cheapest first; ``propagate`` restarts from the top after every successful step.
+TECHNIQUES: tuple[tuple[str, Technique], ...] = (
+    ("naked_single", naked_singles),
+    ("hidden_single", hidden_singles),
+    ("locked_candidates", locked_candidates),
+    ("x_wing", x_wing),
+)
+
+
+def is_consistent(cube: np.ndarray) -> np.ndarray:
+    """Check that every cell has a candidate and every digit has a place in every unit."""
+    return to_units(cube).any(axis=-2).all(axis=(-2, -1)) & cube.any(axis=-1).all(
+        axis=(-2, -1)
+    )
+
+
+def propagate(
+    cube: np.ndarray,
+    techniques: Sequence[tuple[str, Technique]] = TECHNIQUES,
+) -> np.ndarray:
+    """Apply ``techniques`` to ``cube`` in place until none of them eliminates anything.
+
+    Args:
+        cube (np.ndarray): The candidate cube, modified in place.
+        techniques (Sequence[tuple[str, Technique]], optional): Named techniques, cheapest first.
+    Returns:
+        np.ndarray: Per board, whether the cube is still consistent.
+    """
+    step = 0
+    while step < len(techniques):
+        eliminations = techniques[step][1](cube)
+        if eliminations.any():
+            cube &= ~eliminations
+            if not is_consistent(cube).all():
+                break
+            step = 0
+        else:
+            step += 1
+    return is_consistent(cube)
@@ -0,0 +1,175 @@
+"""Difficulty rating by the logical techniques a puzzle needs.
+
+Every step applies the cheapest technique on the ``LADDER`` that eliminates
+anything; the grade is the rating of the hardest technique used, in the spirit of
+Sudoku Explainer ratings. Puzzles the ladder can't finish get ``SEARCH_GRADE``.
+Stacks of boards are rated together, each board on its own path up the ladder.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+
+from core.propagation import (
+    Technique,
+    fish,
+    from_units,
+    hidden_singles,
+    hidden_subsets,
+    is_consistent,
+    locked_candidates,
+    naked_singles,
+    naked_subsets,
+    to_units,
+)
+
+# (name, technique, rating), easiest first.
+LADDER: tuple[tuple[str, Technique, float], ...] = (
+    ("hidden_single", hidden_singles, 1.2),
+    ("naked_single", naked_singles, 2.3),
+    ("locked_candidates", locked_candidates, 2.6),
+    ("naked_pair", partial(naked_subsets, size=2), 3.0),
+    ("x_wing", partial(fish, size=2), 3.2),
+    ("hidden_pair", partial(hidden_subsets, size=2), 3.4),
+    ("naked_triple", partial(naked_subsets, size=3), 3.6),
+    ("swordfish", partial(fish, size=3), 3.8),
+    ("hidden_triple", partial(hidden_subsets, size=3), 4.0),
+    ("naked_quad", partial(naked_subsets, size=4), 5.0),
+    ("jellyfish", partial(fish, size=4), 5.2),
+    ("hidden_quad", partial(hidden_subsets, size=4), 5.4),
+)
+
+TECHNIQUE_NAMES = tuple(name for name, _technique, _rating in LADDER)
+_RATINGS = np.array([rating for _name, _technique, rating in LADDER])
+
+# The grade of puzzles that need guessing (or have no solution at all).
+SEARCH_GRADE = 10.0
+
+
+@dataclass(frozen=True, slots=True)
+class Rating:
+    """Difficulty of one board or a stack of them, as returned by ``rate_cubes``."""
+
+    # (...): rating of the hardest technique used, ``SEARCH_GRADE`` if the ladder got stuck.
+    grade: np.ndarray
+    # (..., len(LADDER)): how many steps used each technique, indexed like ``LADDER``.
+    counts: np.ndarray
+    # (...): whether the ladder alone solved the board.
+    solved: np.ndarray
+
+    def technique_counts(self) -> dict[str, int]:
+        """The techniques a single board used and how often, easiest first."""
+        return {
+            name: int(count)
+            for name, count in zip(TECHNIQUE_NAMES, self.counts)
+            if count
+        }
+
+
+def _place(cube: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    """Eliminations that write down the solved ``cells``: their digits leave the peers.
+
+    Placing a hidden single is part of the technique, so this step is free; a cell
+    that ends up with one candidate some other way still needs a naked single.
+    """
+    units = to_units(cube)
+    in_cells = to_units(np.broadcast_to(cells[..., None], cube.shape))
+    solved = units & in_cells & (units.sum(axis=-1, keepdims=True) == 1)
+    placed = solved.any(axis=-2, keepdims=True)
+    return from_units(units & placed & ~solved)
+
+
+def rate_cubes(cube: np.ndarray, stop_at: float | None = None) -> Rating:
+    """Rate ``(..., N, N, N)`` candidate cubes, solving them in place as far as the ladder goes.
+    Args:
+        cube (np.ndarray): The boolean candidate cube(s), modified in place.
+        stop_at (float | None, optional): Stop working on a board once its grade reaches this
+            value, e.g. the lower bound of the hardest bucket of interest. Its grade is
+            then a lower bound and its counts are partial. A board is always stopped once it needs the top of the ladder,
+            as its grade can't change after that. Defaults to None.
+    Returns:
+        Rating: The grades, technique counts and solved flags.
+    """
+    lead = cube.shape[:-3]
+    cubes = cube.reshape(-1, *cube.shape[-3:])
+    counts = np.zeros((len(cubes), len(LADDER)), dtype=np.int32)
+    hardest = np.full(len(cubes), -1)
+    stuck = np.zeros(len(cubes), dtype=bool)
+    stop_rung = len(LADDER) - 1
+    if stop_at is not None:
+        stop_rung = min(stop_rung, int(np.searchsorted(_RATINGS, stop_at)))
+
+    def finished(boards: np.ndarray) -> np.ndarray:
+        return (boards.sum(axis=-1) == 1).all(axis=(-2, -1)) | ~is_consistent(boards)
+
+    active = np.flatnonzero(~finished(cubes))
+    while len(active):
+        boards = cubes[active]
+        # Boards still looking for the cheapest technique that makes progress.
+        searching = np.ones(len(active), dtype=bool)
+        for rung, (_name, technique, _rating) in enumerate(LADDER):
+            pending = np.flatnonzero(searching)
+            if not len(pending):
+                break
+            eliminations = technique(boards[pending])
+            hit = eliminations.any(axis=(-3, -2, -1))
+            if hit.any():
+                changed = boards[pending[hit]]
+                changed &= ~eliminations[hit]
+                if technique is hidden_singles:
+                    singles = eliminations[hit].any(axis=-1)
+                    changed &= ~_place(changed, singles)
+                boards[pending[hit]] = changed
+                counts[active[pending[hit]], rung] += 1
+                hardest[active[pending[hit]]] = np.maximum(
+                    hardest[active[pending[hit]]], rung
+                )
+                searching[pending[hit]] = False
+        cubes[active] = boards
+
+        stuck[active[searching]] = True
+        done = searching | finished(boards) | (hardest[active] >= stop_rung)
+        active = active[~done]
+
+    solved = (cubes.sum(axis=-1) == 1).all(axis=(-2, -1)) & is_consistent(cubes)
+    grade = np.where(hardest >= 0, _RATINGS[np.maximum(hardest, 0)], 0.0)
+    grade = np.where(stuck | ~is_consistent(cubes), SEARCH_GRADE, grade)
+    return Rating(
+        grade=grade.reshape(lead),
+        counts=counts.reshape(*lead, len(LADDER)),
+        solved=solved.reshape(lead),
+    )
+
+
+def rate_grids(
+    grids: np.ndarray, stop_at: float | None = None, chunk_size: int = 4096
+) -> Rating:
+    """Rate an ``(N, N)`` puzzle or a ``(..., N, N)`` stack of them.
+    Args:
+        grids (np.ndarray): The puzzle(s), 0 for empty cells.
+        stop_at (float | None, optional): See ``rate_cubes``. Defaults to None.
+        chunk_size (int, optional): How many puzzles to rate together, bounding memory use.
+    Returns:
+        Rating: The grades, technique counts and solved flags.
+    """
+    grids = np.asarray(grids)
+    lead = grids.shape[:-2]
+    size = grids.shape[-1]
+    flat = grids.reshape(-1, size, size)
+    ratings = []
+    for start in range(0, max(len(flat), 1), chunk_size):
+        chunk = flat[start : start + chunk_size]
+        cube = np.where(
+            chunk[..., None] > 0, chunk[..., None] == np.arange(1, size + 1), True
+        )
+        # Only the givens are solved yet, so this just writes them down.
+        cube &= ~naked_singles(cube)
+        ratings.append(rate_cubes(cube, stop_at))
+    return Rating(
+        grade=np.concatenate([r.grade for r in ratings]).reshape(lead),
+        counts=np.concatenate([r.counts for r in ratings]).reshape(*lead, len(LADDER)),
+        solved=np.concatenate([r.solved for r in ratings]).reshape(lead),
+    )
@@ -0,0 +1,264 @@
+"""Iterative, resumable most-constrained-cell-first search.
+
+``IterativeSearch`` branches on the first empty cell with the fewest candidates and
+removes each assigned digit from the candidates of its peers, backtracking as soon
+as one of them runs out. Unlike ``Table.solve(engine="mrv")`` it never branches on
+the places of a digit in a unit, so it may visit more nodes on hard boards, and its
+cells are tried in a different order. It runs without recursion: the branching
+state lives in preallocated per-depth frames and every candidate an assignment takes
+from a peer is pushed on a trail, so undoing it just pops the trail back to the
+frame's mark. Work can therefore be done in bounded
+slices with ``step`` (e.g. from a Kivy ``Clock`` callback) and the whole state can
+be saved with ``state`` and picked up again with ``from_state``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+
+from core.propagation import propagate as propagate_cube
+from core.sudoku import Table, board_geometry, cube_to_grid, grid_geometry
+
+
+class IterativeSearch:
+    """A search over every solution of a board that runs in slices of nodes.
+
+    Each node branches on the first open cell with the fewest candidates (a cell with
+    one or none ends the scan); the digits are tried from lowest to highest.
+    """
+
+    def __init__(self, grid: np.ndarray, candidate_masks: np.ndarray):
+        """Start a search from a grid and the candidate masks of its empty cells.
+        Args:
+            grid (np.ndarray): An ``N x N`` grid, 0 for empty cells.
+            candidate_masks (np.ndarray): Candidate masks (bit ``n - 1`` for ``n``) of the
+                empty cells.
+        """
+        geometry = grid_geometry(grid)
+        values = np.asarray(grid).ravel().tolist()
+        candidates = np.where(np.asarray(grid) == 0, candidate_masks, 0)
+        self._setup(geometry.box, values, candidates.ravel().tolist())
+
+    @classmethod
+    def from_table(cls, table: Table, propagate: bool = True) -> IterativeSearch:
+        """Start a search from a table without changing it.
+        Args:
+            table (Table): The table to solve.
+            propagate (bool, optional): Whether to run the logical techniques first.
+                Defaults to True.
+        """
+        grid, masks = table.sudoku_array, table.candidate_masks
+        if propagate:
+            cube = table.candidate_cube()
+            if not propagate_cube(cube):
+                # A contradiction: a search whose only cell has nothing left to try.
+                cube[:] = False
+            grid, masks = cube_to_grid(cube)
+        return cls(grid, masks)
+
+    def _setup(self, box: int, values: list[int], candidates: list[int]) -> None:
+        geometry = board_geometry(box)
+        cells = geometry.size**2
+        self._box = box
+        self.size = geometry.size
+        self._peers = geometry.peer_lists
+        self._values = values
+        self._candidates = candidates
+        self._counts = [mask.bit_count() for mask in candidates]
+        # ``_empty[:_open]`` are the cells still to branch on; a frame swaps its cell
+        # to position ``_open - 1`` and remembers where it came from.
+        self._empty = [idx for idx, value in enumerate(values) if not value]
+        self._open = len(self._empty)
+
+        # One frame per depth: the cell, its old position in ``_empty``, the candidates
+        # not tried yet, the one being tried (0 for none) and the trail mark.
+        self._frame_cell = [0] * (cells + 1)
+        self._frame_pos = [0] * (cells + 1)
+        self._frame_untried = [0] * (cells + 1)
+        self._frame_bit = [0] * (cells + 1)
+        self._frame_mark = [0] * (cells + 1)
+        # The peers that lost a candidate, deepest assignment last.
+        self._trail = [0] * (cells * (len(self._peers[0]) if cells > 1 else 0) + 1)
+        self._trail_top = 0
+        self.depth = 0
+        # Whether the next node opens a new frame, rather than trying the next
+        # candidate of the top one.
+        self._descending = True
+        self.finished = False
+        self.nodes = 0
+        self.solutions_found = 0
+
+    def step(
+        self,
+        max_nodes: int | None = None,
+        max_solutions: int | None = None,
+        collect: bool = True,
+    ) -> list[np.ndarray]:
+        """Run the search for a bounded slice of work.
+        Args:
+            max_nodes (int | None, optional): Stop after opening this many nodes. None runs
+                without a node bound. Defaults to None.
+            max_solutions (int | None, optional): Stop once this many solutions were found
+                in this slice. Defaults to None.
+            collect (bool, optional): Whether to return the solutions; when only counting
+                them, ``solutions_found`` is all that's needed. Defaults to True.
+        Returns:
+            list[np.ndarray]: The solutions found in this slice, in search order. The search
+                is over once ``finished`` is set.
+        """
+        values, candidates, counts = self._values, self._candidates, self._counts
+        empty, peers, trail = self._empty, self._peers, self._trail
+        frame_cell, frame_pos = self._frame_cell, self._frame_pos
+        frame_untried, frame_bit, frame_mark = (
+            self._frame_untried,
+            self._frame_bit,
+            self._frame_mark,
+        )
+        depth, top, open_cells = self.depth, self._trail_top, self._open
+        descending = self._descending
+        found: list[np.ndarray] = []
+        hits = 0
+        budget = -1 if max_nodes is None else max_nodes
+
+        while not self.finished and budget != 0:
+            if descending:
+                budget -= 1
+                self.nodes += 1
+                if not open_cells:
+                    if collect:
+                        found.append(
+                            np.array(values, dtype=np.int8).reshape(
+                                self.size, self.size
+                            )
+                        )
+                    hits += 1
+                    descending = False
+                    if depth == 0:
+                        self.finished = True
+                    if max_solutions is not None and hits >= max_solutions:
+                        break
+                    continue
+
+                best_pos, best_count = 0, self.size + 1
+                for pos in range(open_cells):
+                    count = counts[empty[pos]]
+                    if count < best_count:
+                        best_pos, best_count = pos, count
+                        if count <= 1:
+                            break
+                open_cells -= 1
+                idx = empty[best_pos]
+                empty[best_pos], empty[open_cells] = empty[open_cells], idx
+                frame_cell[depth] = idx
+                frame_pos[depth] = best_pos
+                frame_untried[depth] = candidates[idx]
+                frame_bit[depth] = 0
+                frame_mark[depth] = top
+                depth += 1
+                descending = False
+                continue
+
+            # Take back the candidate tried last at the top frame and try the next one.
+            d = depth - 1
+            idx = frame_cell[d]
+            bit = frame_bit[d]
+            if bit:
+                mark = frame_mark[d]
+                while top > mark:
+                    top -= 1
+                    peer = trail[top]
+                    candidates[peer] |= bit
+                    counts[peer] += 1
+                values[idx] = 0
+
+            untried = frame_untried[d]
+            if not untried:
+                # Exhausted: put the cell back where it was and pop the frame.
+                empty[frame_pos[d]], empty[open_cells] = idx, empty[frame_pos[d]]
+                open_cells += 1
+                depth = d
+                if depth == 0:
+                    self.finished = True
+                continue
+
+            bit = untried & -untried
+            frame_untried[d] = untried ^ bit
+            frame_bit[d] = bit
+            dead_end = False
+            for peer in peers[idx]:
+                if candidates[peer] & bit and not values[peer]:
+                    candidates[peer] ^= bit
+                    counts[peer] -= 1
+                    trail[top] = peer
+                    top += 1
+                    if not counts[peer]:
+                        dead_end = True
+                        break
+            values[idx] = bit.bit_length()
+            # A dead end is undone by the next pass over this frame.
+            descending = not dead_end
+
+        self.depth, self._trail_top, self._open = depth, top, open_cells
+        self._descending = descending
+        self.solutions_found += hits
+        return found
+
+    def solutions(self, chunk_nodes: int = 4096) -> Iterator[np.ndarray]:
+        """Yield the remaining solutions one at a time, stepping ``chunk_nodes`` at a time."""
+        while not self.finished:
+            yield from self.step(chunk_nodes)
+
+    def state(self) -> dict[str, Any]:
+        """The full search state as plain ints and lists, e.g. for ``json.dump``."""
+        depth = self.depth
+        return {
+            "box": self._box,
+            "values": list(self._values),
+            "candidates": list(self._candidates),
+            "empty": list(self._empty),
+            "open": self._open,
+            "depth": depth,
+            "frames": [
+                self._frame_cell[:depth],
+                self._frame_pos[:depth],
+                self._frame_untried[:depth],
+                self._frame_bit[:depth],
+                self._frame_mark[:depth],
+            ],
+            "trail": self._trail[: self._trail_top],
+            "descending": self._descending,
+            "finished": self.finished,
+            "nodes": self.nodes,
+            "solutions_found": self.solutions_found,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> IterativeSearch:
+        """Rebuild a search saved with ``state``; stepping it carries on where it stopped."""
+        search = cls.__new__(cls)
+        search._setup(state["box"], list(state["values"]), list(state["candidates"]))
+        search._empty = list(state["empty"])
+        search._open = state["open"]
+        search.depth = depth = state["depth"]
+        for frame, saved in zip(
+            (
+                search._frame_cell,
+                search._frame_pos,
+                search._frame_untried,
+                search._frame_bit,
+                search._frame_mark,
+            ),
+            state["frames"],
+        ):
+            frame[:depth] = saved
+        trail = state["trail"]
+        search._trail[: len(trail)] = trail
+        search._trail_top = len(trail)
+        search._descending = state["descending"]
+        search.finished = state["finished"]
+        search.nodes = state["nodes"]
+        search.solutions_found = state["solutions_found"]
+        return search
@@ -1,33 +1,292 @@
-from collections.abc import Iterator
-from itertools import islice, product
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import cache
+from itertools import count, product
+from math import isqrt
 from time import time
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 import numpy as np
 
-CELL_COORDS = tuple(product(range(9), range(9)))
+from core.canonical import SolutionCache, random_transform
+from core.dlx import sudoku_solutions
+from core.hints import Hint, find_hint
+from core.monitor import SearchInterrupted, SearchMonitor
+from core.propagation import TECHNIQUES, Technique, is_consistent
+from core.propagation import propagate as propagate_cube
+from core.rating import Rating, rate_cubes
+
+if TYPE_CHECKING:
+    from core.portfolio import Portfolio
 
 GridArray = np.ndarray[tuple[Literal[9], Literal[9]], np.dtype[np.int8]]
 
+Engine = Literal["backtrack", "mrv", "dlx", "restarts"]
+
+# The search used for single solutions when none is given on boards larger than 9x9.
+# Boards 55-60% empty sit where completing a Latin square is hardest, and how long a
+# fixed search order takes there is heavy-tailed. On 25x25 boards 60% empty
+# (``python -m tools.bench_large --seeds 16``) MRV and DLX each run past 40 s on some
+# boards; short MRV runs on randomly transformed copies solve all 16 within 9 s, half
+# of them within 1 s. At 55% empty some boards still take longer than 30 s.
+LARGE_BOARD_ENGINE: Engine = "restarts"
+# Nodes of the shortest restart; run ``i`` gets ``luby(i)`` times as many.
+_RESTART_NODES = 2048
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Geometry:
+    """Index tables of an ``N x N`` board made of ``box x box`` sections (``N = box ** 2``).
+
+    Cells are flat indices (``x * N + y``), for fancy indexing a raveled grid.
+    """
+
+    box: int
+    size: int
+    cell_coords: tuple[tuple[int, int], ...]
+    # ``row_units[i]``, ``column_units[i]`` and ``section_units[i]`` list the cells of
+    # row / column / section ``i``; ``units`` stacks all 3N of them in that order.
+    row_units: np.ndarray
+    column_units: np.ndarray
+    section_units: np.ndarray
+    units: np.ndarray
+    # The section each cell belongs to.
+    cell_section: np.ndarray
+    # The indices into ``units`` of each cell's row, column and section.
+    cell_units: np.ndarray
+    # The cells sharing a row, column or section with each cell, in ascending order.
+    peers: np.ndarray
+    # Plain-int copies for the pure Python search loops.
+    peer_lists: list[list[int]]
+    unit_lists: list[list[int]]
+    cell_unit_lists: list[list[int]]
+    # Candidate sets are N-bit masks: bit ``n - 1`` set means ``n`` is still possible.
+    full_mask: int
+    # uint16 fits boards up to 16x16; larger ones need uint32 masks.
+    mask_dtype: type
+    # ``digit_bits[n]`` is the mask of digit ``n``; index 0 (empty cell) maps to no bits.
+    digit_bits: np.ndarray
+
+
+@cache
+def board_geometry(box: int = 3) -> Geometry:
+    """Build (once) the index tables of a board with ``box x box`` sections."""
+    size = box * box
+    cells = size * size
+    rows = np.arange(cells, dtype=np.intp).reshape(size, size)
+    columns = rows.T.copy()
+    sections = (
+        rows.reshape(box, box, box, box).swapaxes(1, 2).reshape(size, size).copy()
+    )
+    cell_section = np.empty(cells, dtype=np.intp)
+    cell_section[sections] = np.arange(size)[:, None]
+    flat = np.arange(cells)
+    peers = np.array(
+        [
+            np.setdiff1d(
+                np.concatenate(
+                    (rows[idx // size], columns[idx % size], sections[section])
+                ),
+                idx,
+            )
+            for idx, section in enumerate(cell_section)
+        ]
+    )
+    units = np.concatenate((rows, columns, sections))
+    cell_units = np.stack(
+        (flat // size, size + flat % size, 2 * size + cell_section), axis=1
+    )
+    mask_dtype = np.uint16 if size <= 16 else np.uint32
+    return Geometry(
+        box=box,
+        size=size,
+        cell_coords=tuple(product(range(size), range(size))),
+        row_units=rows,
+        column_units=columns,
+        section_units=sections,
+        units=units,
+        cell_section=cell_section,
+        cell_units=cell_units,
+        peers=peers,
+        peer_lists=peers.tolist(),
+        unit_lists=units.tolist(),
+        cell_unit_lists=cell_units.tolist(),
+        full_mask=(1 << size) - 1,
+        mask_dtype=mask_dtype,
+        digit_bits=np.array([0] + [1 << bit for bit in range(size)], dtype=mask_dtype),
+    )
+
+
+def grid_geometry(grid: np.ndarray) -> Geometry:
+    """Get the geometry of a grid (or stack of grids) from its last axis."""
+    size = grid.shape[-1]
+    box = isqrt(size)
+    if box * box != size or grid.shape[-2] != size:
+        raise ValueError(f"Not a sudoku board shape: {grid.shape[-2:]}")
+    return board_geometry(box)
+
+
+# The tables of the classic 9x9 board.
+_GEOMETRY = board_geometry(3)
+CELL_COORDS = _GEOMETRY.cell_coords
+ROW_UNITS = _GEOMETRY.row_units
+COLUMN_UNITS = _GEOMETRY.column_units
+SECTION_UNITS = _GEOMETRY.section_units
+UNITS = _GEOMETRY.units
+CELL_SECTION = _GEOMETRY.cell_section
+CELL_UNITS = _GEOMETRY.cell_units
+PEERS = _GEOMETRY.peers
+FULL_MASK = _GEOMETRY.full_mask
+
+# The MRV search's count of places for a digit already placed in a unit.
+_PLACED = 1 << 30
+# Peers that lost the digit, place counts taken down and place counts overwritten.
+_MrvUndo = tuple[list[int], list[int], list[tuple[int, int]]]
+
+
+def _luby(run: int) -> int:
+    """The ``run``-th term (from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ..."""
+    while True:
+        bits = run.bit_length()
+        if run == (1 << bits) - 1:
+            return 1 << (bits - 1)
+        run -= (1 << (bits - 1)) - 1
+
+
+def digit_mask(number: int) -> int:
+    """Return the candidate mask bit for ``number``."""
+    return 1 << (int(number) - 1)
+
+
+def mask_to_digits(mask: int) -> list[int]:
+    """List the digits set in a candidate mask, smallest first.
+    Args:
+        mask (int): The candidate mask.
+    Returns:
+        list[int]: The digits contained in the mask.
+    """
+    mask = int(mask)
+    digits = []
+    while mask:
+        low_bit = mask & -mask
+        digits.append(low_bit.bit_length())
+        mask ^= low_bit
+    return digits
+
+
+def cube_to_grid(cube: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Split a candidate cube into its solved cells and the candidate masks of the rest.
+    Args:
+        cube (np.ndarray): An ``(N, N, N)`` boolean candidate cube.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The grid of solved cells (0 elsewhere) and the
+            candidate masks of the unsolved cells (0 for solved ones).
+    """
+    geometry = grid_geometry(cube[..., 0])
+    solved = cube.sum(axis=-1) == 1
+    grid = np.where(solved, cube.argmax(axis=-1) + 1, 0).astype(np.int8)
+    masks = (cube * (1 << np.arange(geometry.size, dtype=np.int64))).sum(axis=-1)
+    return grid, np.where(solved, 0, masks).astype(geometry.mask_dtype)
+
+
+@dataclass(frozen=True, slots=True)
+class ValidationResult:
+    """Repeated numbers found by ``validate_grids``, for one grid or a stack of them."""
+
+    # (..., N, N): the cell's number is repeated in its row, column or section.
+    conflicts: np.ndarray
+    # (..., 3N): the unit repeats a number; indexed like ``Geometry.units`` (rows, columns, sections).
+    bad_units: np.ndarray
+
+    @property
+    def valid(self) -> np.ndarray:
+        """Per grid, whether no unit repeats a number."""
+        return ~self.bad_units.any(axis=-1)
+
+
+def validate_grids(grids: np.ndarray, chunk_size: int = 65536) -> ValidationResult:
+    """Find repeated numbers in an ``(N, N)`` grid or a ``(..., N, N)`` stack of grids.
+
+    Every unit of every grid gets a "seen" and a "seen twice" digit mask, built with
+    one bitwise pass per cell of a unit over all grids at once.
+    Args:
+        grids (np.ndarray): The grid(s), 0 for empty cells.
+        chunk_size (int, optional): How many grids to check at once, bounding memory use.
+    Returns:
+        ValidationResult: The conflicting cells and the units they repeat in.
+    """
+    grids = np.asarray(grids)
+    geometry = grid_geometry(grids)
+    lead = grids.shape[:-2]
+    flat = grids.reshape(-1, geometry.size**2)
+    units, cell_units = geometry.units, geometry.cell_units
+    conflicts = np.zeros(flat.shape, dtype=bool)
+    bad_units = np.zeros((len(flat), len(units)), dtype=bool)
+
+    for start in range(0, len(flat), chunk_size):
+        bits = geometry.digit_bits[flat[start : start + chunk_size]]
+        seen = np.zeros((len(bits), len(units)), dtype=geometry.mask_dtype)
+        repeated = np.zeros_like(seen)
+        for cells in units.T:
+            unit_bits = bits[:, cells]
+            repeated |= seen & unit_bits
+            seen |= unit_bits
+        bad_units[start : start + chunk_size] = repeated != 0
+        cell_repeated = (
+            repeated[:, cell_units[:, 0]]
+            | repeated[:, cell_units[:, 1]]
+            | repeated[:, cell_units[:, 2]]
+        )
+        conflicts[start : start + chunk_size] = (cell_repeated & bits) != 0
+
+    return ValidationResult(
+        conflicts=conflicts.reshape(grids.shape),
+        bad_units=bad_units.reshape(*lead, len(units)),
+    )
+
 
 class Table:
     """Sudoku table class."""
 
-    def __init__(self, array=None, empty=" "):
+    def __init__(self, array=None, empty=" ", box: int = 3):
         """Initialize the Sudoku table.
 
         Args:
-            array (list, optional): The Sudoku array. Defaults to None.
+            array (list, optional): The Sudoku array, any ``N x N`` with ``N`` a square.
+                Defaults to None.
             empty (str, optional): The empty value. Defaults to " ".
+            box (int, optional): The section size of an empty table when no array is given,
+                e.g. 4 for 16x16. Defaults to 3.
         """
         self.sudoku_array = (
-            np.array(array) if array is not None else np.zeros((9, 9), dtype=np.int8)
+            np.array(array)
+            if array is not None
+            else np.zeros((box * box, box * box), dtype=np.int8)
         )
+        self.geometry = grid_geometry(self.sudoku_array)
+        self.size = self.geometry.size
         self.empty = empty
-        self.candidates = np.ndarray((9, 9), dtype=list)
+        # Per-cell candidate masks (0 for filled cells) and the digits already
+        # placed in each row, column and section, all kept up to date incrementally.
+        mask_dtype = self.geometry.mask_dtype
+        self.candidate_masks = np.zeros((self.size, self.size), dtype=mask_dtype)
+        self.row_masks = np.zeros(self.size, dtype=mask_dtype)
+        self.column_masks = np.zeros(self.size, dtype=mask_dtype)
+        self.section_masks = np.zeros(self.size, dtype=mask_dtype)
         self.given_sudoku: GridArray = np.array(self.sudoku_array, dtype=np.int8)
         self.gen_candidates()
         self.solutions = list()
+        # The monitor of the running ``solve``, ticked by the recursive searches.
+        self._monitor: SearchMonitor | None = None
+
+    @property
+    def candidates(self) -> np.ndarray:
+        """The candidates of every cell as lists, ``None`` for filled cells."""
+        candidates = np.ndarray((self.size, self.size), dtype=list)
+        for x, y in self.geometry.cell_coords:
+            if self.is_cell_empty(x, y):
+                candidates[x, y] = mask_to_digits(self.candidate_masks[x, y])
+        return candidates
 
     def is_cell_empty(self, x: int, y: int) -> np.bool:
         """Check if the cell is empty.
@@ -47,7 +306,8 @@ class Table:
         Returns:
             np.ndarray: The section.
         """
-        return self.get_section(array, idx // 3, idx % 3)
+        box = self.geometry.box
+        return self.get_section(array, idx // box, idx % box)
 
     def get_section(self, array: np.ndarray, x: int, y: int) -> np.ndarray:
         """Get the section by x and y.
@@ -58,7 +318,8 @@ class Table:
         Returns:
             np.ndarray: The section.
         """
-        return array[x * 3 : (x + 1) * 3, y * 3 : (y + 1) * 3]
+        box = self.geometry.box
+        return array[x * box : (x + 1) * box, y * box : (y + 1) * box]
 
     def is_valid_cell_for_number(self, number: int, x: int, y: int) -> np.bool:
         """Check if the cell with the given row and column index is valid for the number.
@@ -70,7 +331,7 @@ class Table:
             np.bool: True if the cell is valid for the number, False otherwise.
         """
 
-        return np.bool(number in self.get_valid_numbers_for_cell(x, y))
+        return np.bool(self._free_mask(x, y) & digit_mask(number))
 
     def get_valid_numbers_for_cell(self, x: int, y: int) -> list[int]:
         """Get the valid numbers for the cell with the given row and column index.
@@ -81,17 +342,30 @@ class Table:
             list: The valid numbers for the cell.
         """
 
-        row = set(cell for idx, cell in enumerate(self.sudoku_array[x]) if idx != y)
-
-        column = set(
-            cell for idx, cell in enumerate(self.sudoku_array[:, y]) if idx != x
-        )
+        return mask_to_digits(self._free_mask(x, y))
 
-        section_array = self.get_section(self.sudoku_array, x // 3, y // 3).flatten()
-        cell_idx = x % 3 * 3 + y % 3
-        section = set(cell for idx, cell in enumerate(section_array) if idx != cell_idx)
+    def _free_mask(self, x: int, y: int) -> int:
+        """Get the mask of numbers not used by any other cell in the row, column or section.
+        Args:
+            x (int): The row index of the cell.
+            y (int): The column index of the cell.
+        Returns:
+            int: The mask of free numbers.
+        """
+        geometry = self.geometry
+        idx = x * self.size + y
+        if self.is_cell_empty(x, y):
+            used = (
+                self.row_masks[x]
+                | self.column_masks[y]
+                | self.section_masks[geometry.cell_section[idx]]
+            )
+            return geometry.full_mask & ~int(used)
 
-        return list(set(range(1, 10)) - row - column - section)
+        # The occupancy masks include the cell itself, so look at the peers instead.
+        peers = self.sudoku_array.ravel()[geometry.peers[idx]]
+        used = np.bitwise_or.reduce(geometry.digit_bits[peers])
+        return geometry.full_mask & ~int(used)
 
     def get_valid_cells_for_number(self, number: int | None) -> list[bool]:
         """Get the valid cells for a number.
@@ -101,148 +375,125 @@ class Table:
             list[bool]: A list of booleans indicating if the cell is valid for the number.
         """
         if number is None:
-            return list(np.full(81, False))
-        result = []
-        for x, y in CELL_COORDS:
-            result.append(self.candidates_contain(number, x, y))
-        return result
+            return list(np.full(self.size**2, False))
+        return ((self.candidate_masks & digit_mask(number)) != 0).ravel().tolist()
 
     def get_errors(self) -> list[bool]:
         """Get any errors in the table.
         Returns:
             list[bool]: A list of booleans indicating if the cell is valid.
         """
-        return [
-            not self.is_cell_empty(x, y)
-            and not self.is_valid_cell_for_number(self.sudoku_array[x, y], x, y)
-            for x, y in CELL_COORDS
-        ]
+        return validate_grids(self.sudoku_array).conflicts.ravel().tolist()
 
     def gen_candidates(self) -> None:
         """Generate the candidates for all cells in the table."""
-        for x, y in CELL_COORDS:
-            self.candidates[x, y] = (
-                self.get_valid_numbers_for_cell(x, y)
-                if self.is_cell_empty(x, y)
-                else None
-            )
+        self._gen_occupancy()
+        geometry = self.geometry
+        used = (
+            self.row_masks[:, None]
+            | self.column_masks[None, :]
+            | self.section_masks[geometry.cell_section].reshape(self.size, self.size)
+        )
+        self.candidate_masks = np.where(
+            self.sudoku_array == 0, geometry.full_mask & ~used, 0
+        ).astype(geometry.mask_dtype)
+
+    def _gen_occupancy(self) -> None:
+        """Recompute the row, column and section occupancy masks from the grid."""
+        geometry = self.geometry
+        bits = geometry.digit_bits[self.sudoku_array.ravel()]
+        self.row_masks = np.bitwise_or.reduce(bits[geometry.row_units], axis=1)
+        self.column_masks = np.bitwise_or.reduce(bits[geometry.column_units], axis=1)
+        self.section_masks = np.bitwise_or.reduce(bits[geometry.section_units], axis=1)
+
+    def candidate_cube(self) -> np.ndarray:
+        """Get the candidates as an ``(N, N, N)`` boolean cube indexed ``[x, y, number - 1]``.
+        Filled cells hold only their own number.
+        """
+        masks = np.where(
+            self.sudoku_array == 0,
+            self.candidate_masks,
+            self.geometry.digit_bits[self.sudoku_array],
+        )
+        return (masks[..., None] >> np.arange(self.size) & 1).astype(bool)
+
+    def load_candidate_cube(self, cube: np.ndarray) -> None:
+        """Take over the candidates of a cube, filling every empty cell left with one candidate.
+        Args:
+            cube (np.ndarray): An ``(N, N, N)`` boolean candidate cube.
+        """
+        grid, masks = cube_to_grid(cube)
+        empty = self.sudoku_array == 0
+        self.sudoku_array[empty] = grid[empty]
+        self.candidate_masks = np.where(self.sudoku_array == 0, masks, 0).astype(
+            self.geometry.mask_dtype
+        )
+        self._gen_occupancy()
+
+    def _apply_techniques(self, techniques: Sequence[tuple[str, Technique]]) -> bool:
+        """Propagate the given techniques on the candidate cube and load the result."""
+        cube = self.candidate_cube()
+        consistent = bool(propagate_cube(cube, techniques))
+        self.load_candidate_cube(cube)
+        return consistent
+
+    def find_new_values(self) -> bool:
+        """Fill in naked and hidden singles until there are none left.
+        Returns:
+            bool: False if the table turned out to be contradictory, True otherwise.
+        """
+        return self._apply_techniques(TECHNIQUES[:2])
+
+    def filter_candidates(self) -> bool:
+        """Remove candidates with pointing / claiming (locked candidates) and X-Wings.
+        Returns:
+            bool: False if the table turned out to be contradictory, True otherwise.
+        """
+        return self._apply_techniques(TECHNIQUES[2:])
 
-    # def filter_candidates(self):
-    #     for number in range(1, 10):
-    #         number_in_candidates = np.zeros((9, 9), dtype=np.int64)
-    #         in_row = np.zeros((9, 3))
-    #         in_column = np.zeros((9, 3))
-
-    #         for x, y in CELL_COORDS:
-    #             number_in_candidates[x, y] = self.candidates_contain(number, x, y)
-
-    #         for idx in range(9):
-    #             section = self.get_section_by_idx(number_in_candidates, idx)
-    #             in_row[idx] = np.any(section, axis=1)
-    #             in_column[idx] = np.any(section, axis=0)
-
-    #         for x, y in product(range(3), range(3)):
-    #             if sum(in_row[x * 3 + y]) == 1:
-    #                 replace_x = in_row[x * 3 + y].nonzero()[0]
-    #                 for i in range(3):
-    #                     if i != y:
-    #                         section = self.get_section(self.candidates, x, i)
-    #                         self.remove_candidate_from_cells(number, section[replace_x])
-
-    #             if sum(in_column[x * 3 + y]) == 1:
-    #                 replace_y = in_column[x * 3 + y].nonzero()[0]
-    #                 for i in range(3):
-    #                     if i != x:
-    #                         section = self.get_section(self.candidates, i, y)
-    #                         self.remove_candidate_from_cells(
-    #                             number, section[:, replace_y]
-    #                         )
-
-    # for i in range(3):
-    #     col1 = i
-    #     col2 = 3 + i
-    #     col3 = 6 + i
-
-    #     self.xwing(number, col1, col2, col3, in_column, True)
-    #     self.xwing(number, col2, col3, col1, in_column, True)
-    #     self.xwing(number, col1, col3, col2, in_column, True)
-
-    #     row1 = i * 3
-    #     row2 = i * 3 + 1
-    #     row3 = i * 3 + 2
-
-    #     self.xwing(number, row1, row2, row3, in_row, False)
-    #     self.xwing(number, row2, row3, row1, in_row, False)
-    #     self.xwing(number, row1, row3, row2, in_row, False)
-
-    # def xwing(self, number, check_idx1, check_idx2, change_idx3, in_line, is_column):
-    #     if sum(in_line[check_idx1]) == 2 and all(
-    #         in_line[check_idx1] == in_line[check_idx2]
-    #     ):
-    #         subsection = self.get_section_by_idx(self.candidates, change_idx3)
-    #         for subsection_column in range(3):
-    #             if in_line[check_idx1][subsection_column]:
-    #                 if is_column:
-    #                     self.remove_candidate_from_cells(
-    #                         number, subsection[:, subsection_column]
-    #                     )
-    #                 else:
-    #                     self.remove_candidate_from_cells(
-    #                         number, subsection[subsection_column]
-    #                     )
+    def propagate(self) -> bool:
+        """Run all logical techniques to a fixpoint, filling in every forced number.
+        Returns:
+            bool: False if the table turned out to be contradictory, True otherwise.
+        """
+        return self._apply_techniques(TECHNIQUES)
+
+    def rate(self, stop_at: float | None = None) -> Rating:
+        """Rate the difficulty of the table from its current candidates, without changing it.
+        Args:
+            stop_at (float | None, optional): Stop once the grade reaches this value. Defaults to None.
+        Returns:
+            Rating: The grade and how often each technique of ``core.rating.LADDER`` was needed.
+        """
+        return rate_cubes(self.candidate_cube(), stop_at)
+
+    def hint(self) -> Hint | None:
+        """Find the cheapest logical step from the current candidates, without changing the table.
+
+        The hint is one instance of the technique: the cells, numbers and units that form
+        the pattern and the candidates it removes (singles also place their number).
+        Techniques are tried in the order of ``core.rating.LADDER``.
+        Returns:
+            Hint | None: The step, or None if no technique applies.
+        """
+        return find_hint(
+            self.candidate_cube(), self.sudoku_array == 0, self.geometry.units
+        )
+
+    def apply_hint(self, hint: Hint) -> None:
+        """Carry out a hint: remove its eliminated candidates and fill in its placements."""
+        for x, y, number in hint.eliminations:
+            self.candidate_masks[x, y] &= ~digit_mask(number) & self.geometry.full_mask
+        for x, y, number in hint.placements:
+            self.insert_number(number, x, y)
 
     def remove_candidate_from_cells(self, number: int, cells: np.ndarray) -> None:
         """Remove a candidate from each cell in the cells array.
         Args:
             number (int): The number to remove.
-            cells (np.ndarray): The cells to remove the candidate from.
+            cells (np.ndarray): A view into ``candidate_masks`` to remove the candidate from.
         """
-        for cell in cells.flatten():
-            if cell and number in cell:
-                cell.remove(number)
-
-    # def single_candidate_in_list(self, number: int, array: np.ndarray) -> bool:
-    #     """Check if the number is the only candidate in the array.
-    #     Args:
-    #         number (int): The number to check.
-    #         array (np.ndarray): The array to check.
-    #     Returns:
-    #         bool: True if the number is the only candidate in the array, False otherwise.
-    #     """
-    #     return sum([number in candidates for candidates in array if candidates]) == 1
-
-    # def find_new_values(self) -> None:
-    #     row_sums = np.zeros((9, 9))
-    #     column_sums = np.zeros((9, 9))
-    #     section_sums = np.zeros((3, 3, 9))
-
-    #     for number, idx in CELL_COORDS:
-    #         row_sums[idx, number] = self.single_candidate_in_list(
-    #             number + 1, self.candidates[idx]
-    #         )
-
-    #         column_sums[idx, number] = self.single_candidate_in_list(
-    #             number + 1, self.candidates[:, idx]
-    #         )
-
-    #         sub_section = self.get_section_by_idx(self.candidates, idx).flatten()
-    #         section_sums[idx // 3, idx % 3, number] = self.single_candidate_in_list(
-    #             number + 1, sub_section
-    #         )
-
-    #     for x, y in CELL_COORDS:
-    #         if self.candidates[x, y] is None:
-    #             continue
-
-    #         if len(self.candidates[x, y]) == 1:
-    #             self.insert_number(self.candidates[x, y][0], x, y)
-    #             continue
-
-    #         for array in [row_sums[x], column_sums[y], section_sums[x // 3, y // 3]]:
-    #             for number in array.nonzero()[0] + 1:
-    #                 if self.candidates_contain(number, x, y):
-    #                     self.insert_number(number, x, y)
-    #                     break
+        cells &= ~digit_mask(number) & self.geometry.full_mask
 
     def insert_number(self, number: int, x: int, y: int) -> None:
         """Insert a number into the cell with the given row and column index. Remove the number from the candidates of the row, column and section.
@@ -251,13 +502,22 @@ class Table:
             x (int): The row index of the cell.
             y (int): The column index of the cell.
         """
+        if not self.is_cell_empty(x, y):
+            # Overwriting: the old number has to leave the unit masks and give its
+            # candidate back to the peers first.
+            self.remove_number(x, y)
         self.sudoku_array[x, y] = number
-        self.candidates[x, y] = None
+        self.candidate_masks[x, y] = 0
 
-        self.remove_candidate_from_cells(number, self.candidates[:, y])
-        self.remove_candidate_from_cells(number, self.candidates[x])
-        self.remove_candidate_from_cells(
-            number, self.get_section(self.candidates, x // 3, y // 3)
+        geometry = self.geometry
+        idx = x * self.size + y
+        bit = digit_mask(number)
+        self.row_masks[x] |= bit
+        self.column_masks[y] |= bit
+        self.section_masks[geometry.cell_section[idx]] |= bit
+
+        self.candidate_masks.reshape(-1)[geometry.peers[idx]] &= (
+            geometry.full_mask & ~bit
         )
 
     def remove_number(self, x: int, y: int) -> None:
@@ -267,73 +527,541 @@ class Table:
             y (int): The column index of the cell.
         """
         self.sudoku_array[x, y] = 0
-        # TODO: Optimize this by only generating the candidates
-        # for the cells that are affected by the removal of the number
-        self.gen_candidates()
+        geometry = self.geometry
+        idx = x * self.size + y
+        section = geometry.cell_section[idx]
+        bits = geometry.digit_bits[self.sudoku_array.ravel()]
+
+        # Another cell of the unit may hold the same number, so rebuild the three
+        # occupancy masks from their cells rather than just clearing the bit.
+        self.row_masks[x] = np.bitwise_or.reduce(bits[geometry.row_units[x]])
+        self.column_masks[y] = np.bitwise_or.reduce(bits[geometry.column_units[y]])
+        self.section_masks[section] = np.bitwise_or.reduce(
+            bits[geometry.section_units[section]]
+        )
 
-    def solve(self, single_solution: bool = True) -> None:
-        """Solve the Sudoku puzzle using backpropagation.
+        # Only the cell and its empty peers can regain candidates.
+        cells = np.append(geometry.peers[idx], idx)
+        cells = cells[bits[cells] == 0]
+        used = (
+            self.row_masks[cells // self.size]
+            | self.column_masks[cells % self.size]
+            | self.section_masks[geometry.cell_section[cells]]
+        )
+        self.candidate_masks.reshape(-1)[cells] = geometry.full_mask & ~used
+
+    def solve(
+        self,
+        single_solution: bool = True,
+        engine: Engine | None = None,
+        propagate: bool = True,
+        cache: SolutionCache | None = None,
+        monitor: SearchMonitor | None = None,
+        portfolio: "Portfolio | None" = None,
+    ) -> bool:
+        """Solve the Sudoku puzzle and store the result in ``solutions``.
         Args:
             single_solution (bool, optional): Whether to solve for a single solution or all solutions. Defaults to True.
+            engine (Engine | None, optional): The search to use: "backtrack" for row-major
+                backpropagation, "mrv" for most-constrained-cell-first search with forward
+                checking, "dlx" for exact cover with dancing links or "restarts" for MRV
+                restarted on randomly transformed copies of the board under a growing
+                node budget (single solutions only). None picks "backtrack" on 9x9 boards
+                and, on larger ones, ``LARGE_BOARD_ENGINE`` for a single solution and
+                "dlx" for all of them. Defaults to None.
+            propagate (bool, optional): Whether to fill in everything the logical techniques
+                can deduce before searching. Defaults to True.
+            cache (SolutionCache | None, optional): Look single solutions of 9x9 tables up in
+                this cache first, and store them there after solving. Defaults to None.
+            monitor (SearchMonitor | None, optional): Bounds the time the search may take,
+                lets another thread cancel it and reports its progress. An interrupted
+                search keeps the solutions found so far. Defaults to None.
+            portfolio (Portfolio | None, optional): Race the strategies of this portfolio in
+                worker processes instead of running ``engine``, within the deadline of
+                ``monitor`` if any. Only for single solutions. Defaults to None.
+        Returns:
+            bool: False if the monitor interrupted the search, True otherwise.
         """
-        # prev_num_candidates = float("inf")
-        # self.gen_candidates()
-
-        # while (
-        #     self.num_candidates() < prev_num_candidates
-        #     and self.num_filled_cells(self.sudoku_array) < 81
-        # ):
-        #     prev_num_candidates = self.num_candidates()
-        #     self.find_new_values()
-        #     if self.num_candidates() == prev_num_candidates:
-        #         self.filter_candidates()
-
-        if np.count_nonzero(self.sudoku_array) < 81:
-            self.solutions = []
-            if single_solution:
-                self._backpropagation_single_solutonion(0)
+        if engine is None:
+            if self.size <= 9:
+                engine = "backtrack"
             else:
-                self._backpropagation_all_solutions(0)
+                engine = LARGE_BOARD_ENGINE if single_solution else "dlx"
+        if engine not in ("backtrack", "mrv", "dlx", "restarts"):
+            raise ValueError(f"Unknown solver engine: {engine!r}")
+        if engine == "restarts" and not single_solution:
+            raise ValueError("Restarts only search for a single solution")
+        if portfolio is not None and not single_solution:
+            raise ValueError("A portfolio only races for a single solution")
+
+        completed = True
+        if np.count_nonzero(self.sudoku_array) < self.size**2:
+            use_cache = cache is not None and single_solution and self.size == 9
+            if use_cache:
+                canonical, transform, cached = cache.lookup(self.sudoku_array)
+                if cached is not None:
+                    self.solutions = [cached]
+                    self.sudoku_array = cached.copy()
+                    self.gen_candidates()
+                    return True
+
+            self.solutions = []
+            unsolved = self.sudoku_array.copy(), self.candidate_masks.copy()
+            # A contradiction found while propagating means there is nothing to search.
+            if not propagate or self.propagate():
+                if np.count_nonzero(self.sudoku_array) == self.size**2:
+                    self.solutions.append(self.sudoku_array.copy())
+                elif portfolio is not None:
+                    completed = self._race(portfolio, monitor)
+                else:
+                    completed = self._search(single_solution, engine, monitor)
+
             if len(self.solutions) != 0:
                 self.sudoku_array = self.solutions[0]
+                self.gen_candidates()
+                if use_cache:
+                    cache.store(canonical, transform, self.sudoku_array)
+            else:
+                self.sudoku_array, self.candidate_masks = unsolved
+                self._gen_occupancy()
+        return completed
+
+    def _search(
+        self,
+        single_solution: bool,
+        engine: Engine,
+        monitor: SearchMonitor | None = None,
+    ) -> bool:
+        """Search for solutions from the current candidates with the given engine.
+        Returns:
+            bool: False if ``monitor`` interrupted the search.
+        """
+        self._monitor = monitor
+        try:
+            if engine == "dlx":
+                self._dlx_solutions(single_solution)
+            elif engine == "restarts":
+                self._restart_search()
+            elif engine == "mrv":
+                self._prepare_mrv_search(self.sudoku_array, self.candidate_masks)
+                self._mrv_search(lambda: self._store_solution(single_solution))
+            else:
+                self._prepare_search()
+                if single_solution:
+                    self._backpropagation_single_solutonion(0)
+                else:
+                    self._backpropagation_all_solutions(0)
+        except SearchInterrupted:
+            return False
+        finally:
+            self._monitor = None
+            if monitor is not None:
+                monitor.report()
+        return True
 
-    def _backpropagation_single_solutonion(self, start_idx) -> bool:
-        """Solve the Sudoku puzzle using backpropagation for a single solution."""
-        for x, y in islice(CELL_COORDS, start_idx, 81):
-            if not self.is_cell_empty(x, y):
-                continue
+    def _race(
+        self, portfolio: "Portfolio", monitor: SearchMonitor | None = None
+    ) -> bool:
+        """Solve with the first strategy of ``portfolio`` to answer.
+        Returns:
+            bool: False if no strategy answered before the deadline of ``monitor`` or
+                before it was cancelled.
+        """
+        try:
+            result = portfolio.race(self.sudoku_array, monitor=monitor)
+        finally:
+            if monitor is not None:
+                monitor.report()
+        if result.solution is not None:
+            self.solutions.append(result.solution)
+        return result.winner is not None
+
+    def _dlx_solutions(self, single_solution: bool) -> None:
+        """Solve the Sudoku puzzle as an exact cover problem with dancing links."""
+        for solution in sudoku_solutions(
+            self.sudoku_array, self.candidate_masks, self._monitor
+        ):
+            self.solutions.append(solution)
+            if single_solution:
+                return
 
-            for n in self.get_valid_numbers_for_cell(x, y):
-                self.sudoku_array[x, y] = n
-                if self._backpropagation_single_solutonion(x * 9 + y + 1):
-                    return True
-                self.sudoku_array[x, y] = 0
-            return False
+    def _restart_search(self) -> None:
+        """Find a single solution with MRV runs cut off after a Luby-sequence number of
+        nodes, the first on the board as is and every next one on a random transform.
 
-        self.solutions.append(self.sudoku_array.copy())
-        return True
+        A search order that gets stuck deep in an unsolvable subtree is abandoned
+        instead of exhausted; the runs are deterministic, so a board always takes the
+        same path. A run that finishes within its budget without a solution proves
+        there is none.
+        """
+        monitor = self._monitor
+        cube = self.candidate_cube()
+        bits = 1 << np.arange(self.size, dtype=np.int64)
+        try:
+            for run in count(1):
+                grid, masks = self.sudoku_array, self.candidate_masks
+                transform = None
+                if run > 1:
+                    transform = random_transform(run, self.geometry.box)
+                    grid = transform.apply(grid)
+                    masks = (transform.apply_cube(cube) * bits).sum(axis=-1)
+                self._prepare_mrv_search(grid, masks)
+                self._monitor = budget = SearchMonitor(
+                    deadline=None if monitor is None else monitor.deadline,
+                    cancel=None if monitor is None else monitor.cancel,
+                    max_nodes=_RESTART_NODES * _luby(run),
+                )
+                try:
+                    found = self._mrv_search(lambda: True)
+                except SearchInterrupted:
+                    if budget.nodes < budget.max_nodes:
+                        # Out of time or cancelled rather than out of nodes.
+                        if monitor is not None:
+                            monitor.interrupted = True
+                        raise
+                    continue
+                finally:
+                    if monitor is not None:
+                        monitor.nodes += budget.nodes
+                        monitor.solutions += budget.solutions
+                        monitor.report()
+                if found:
+                    solution = np.array(self._mrv_values, dtype=np.int8).reshape(
+                        self.size, self.size
+                    )
+                    if transform is not None:
+                        solution = transform.invert(solution)
+                    self.solutions.append(solution)
+                return
+        finally:
+            self._monitor = monitor
+
+    def count_solutions(self, limit: int | None = 2, propagate: bool = True) -> int:
+        """Count the solutions of the table without storing them or changing the table.
+
+        Runs the MRV search, which branches on hidden singles as well as naked ones, so
+        no grid sends the uniqueness check into a search DLX would avoid.
+        Args:
+            limit (int | None, optional): Stop counting once this many solutions are found.
+                None counts all of them. Defaults to 2.
+            propagate (bool, optional): Whether to run the logical techniques before searching.
+                Nearly full grids are faster to search directly. Defaults to True.
+        Returns:
+            int: The number of solutions, at most ``limit``.
+        """
+        grid, masks = self.sudoku_array, self.candidate_masks
+        if propagate:
+            cube = self.candidate_cube()
+            if not propagate_cube(cube):
+                return 0
+            grid, masks = cube_to_grid(cube)
+
+        count = 0
+
+        def on_solution() -> bool:
+            nonlocal count
+            count += 1
+            return limit is not None and count >= limit
+
+        self._prepare_mrv_search(grid, masks)
+        self._mrv_search(on_solution)
+        return count
+
+    def iter_solutions(self) -> Iterator[bytes]:
+        """Yield the solutions of the table one at a time without changing the table.
+
+        Each solution is a buffer with one ``uint8`` per cell in row-major order;
+        ``np.frombuffer(buffer, np.uint8).reshape(N, N)`` turns it back into a
+        grid. Nothing is accumulated, so the caller can stop iterating at any point.
+        """
+        cube = self.candidate_cube()
+        if not propagate_cube(cube):
+            return
 
-    def _backpropagation_all_solutions(self, start_idx):
-        """Solve the Sudoku puzzle using backpropagation for all solutions."""
-        for x, y in islice(CELL_COORDS, start_idx, 81):
-            if not self.is_cell_empty(x, y):
+        for solution in sudoku_solutions(*cube_to_grid(cube)):
+            yield solution.tobytes()
+
+    def has_unique_solution(self) -> bool:
+        """Check if the table has exactly one solution."""
+        return self.count_solutions(limit=2) == 1
+
+    def _store_solution(self, single_solution: bool) -> bool:
+        """Append the current MRV search grid to ``solutions``; True stops the search."""
+        self.solutions.append(
+            np.array(self._mrv_values, dtype=np.int8).reshape(self.size, self.size)
+        )
+        return single_solution
+
+    def _prepare_mrv_search(
+        self, grid: np.ndarray, candidate_masks: np.ndarray
+    ) -> None:
+        """Snapshot the grid, candidate masks and candidate counts as flat int lists,
+        and count how many cells of every unit can still take every digit.
+
+        Without those place counts the search has no hidden singles and thrashes on
+        puzzles where digits, not cells, are the tight constraint.
+        """
+        geometry = self.geometry
+        self._mrv_values = grid.ravel().tolist()
+        self._mrv_candidates = candidate_masks.ravel().tolist()
+        self._mrv_counts = [mask.bit_count() for mask in self._mrv_candidates]
+        self._mrv_empty = [
+            idx for idx, value in enumerate(self._mrv_values) if not value
+        ]
+        self._mrv_open = len(self._mrv_empty)
+
+        # ``_mrv_places[unit * N + digit - 1]``; digits already placed in the unit
+        # get ``_PLACED`` so they never look like the most constrained choice.
+        open_masks = np.where(grid.ravel() == 0, candidate_masks.ravel(), 0)
+        offers = (open_masks[geometry.units, None] >> np.arange(self.size)) & 1
+        placed_bits = np.bitwise_or.reduce(
+            geometry.digit_bits[grid.ravel()][geometry.units], axis=1
+        )
+        placed = (placed_bits[:, None] >> np.arange(self.size)) & 1
+        self._mrv_places = (
+            np.where(placed != 0, _PLACED, offers.sum(axis=1)).ravel().tolist()
+        )
+
+    def _mrv_search(self, on_solution: Callable[[], bool]) -> bool:
+        """Search branching on the empty cell with the fewest candidates, or on the
+        fewest places left for a digit in a unit when that is smaller.
+        Args:
+            on_solution (Callable[[], bool]): Called with ``_mrv_values`` holding a solution;
+                returning True stops the search.
+        Returns:
+            bool: True if the search was stopped by ``on_solution``.
+        """
+        empty = self._mrv_empty
+        monitor = self._monitor
+        if monitor is not None:
+            monitor.tick(self._mrv_open - len(empty))
+        if not empty:
+            if monitor is not None:
+                monitor.solutions += 1
+            return on_solution()
+
+        counts = self._mrv_counts
+        best_pos, best_count = 0, self.size + 1
+        for pos, idx in enumerate(empty):
+            if counts[idx] < best_count:
+                best_pos, best_count = pos, counts[idx]
+                if best_count <= 1:
+                    break
+
+        places = self._mrv_places
+        if best_count > 1:
+            fewest = min(places)
+            if fewest < best_count:
+                return self._mrv_branch_on_places(places.index(fewest), on_solution)
+
+        # Swap the chosen cell to the end so removing and restoring it is O(1).
+        empty[best_pos], empty[-1] = empty[-1], empty[best_pos]
+        idx = empty.pop()
+
+        free = self._mrv_candidates[idx]
+        while free:
+            bit = free & -free
+            free ^= bit
+            undo = self._mrv_assign(idx, bit)
+            if undo is None:
+                continue
+            self._mrv_values[idx] = bit.bit_length()
+            if self._mrv_search(on_solution):
+                return True
+            self._mrv_unassign(undo, bit)
+
+        self._mrv_values[idx] = 0
+        empty.append(idx)
+        empty[best_pos], empty[-1] = empty[-1], empty[best_pos]
+        return False
+
+    def _mrv_branch_on_places(self, key: int, on_solution: Callable[[], bool]) -> bool:
+        """Try each cell of a unit that can still take the digit, as ``_mrv_search`` does."""
+        unit, offset = divmod(key, self.size)
+        bit = 1 << offset
+        empty, values, candidates = (
+            self._mrv_empty,
+            self._mrv_values,
+            self._mrv_candidates,
+        )
+        for idx in self.geometry.unit_lists[unit]:
+            if values[idx] or not candidates[idx] & bit:
                 continue
+            undo = self._mrv_assign(idx, bit)
+            if undo is None:
+                continue
+            pos = empty.index(idx)
+            empty[pos], empty[-1] = empty[-1], empty[pos]
+            empty.pop()
+            values[idx] = offset + 1
+            if self._mrv_search(on_solution):
+                return True
+            values[idx] = 0
+            empty.append(idx)
+            empty[pos], empty[-1] = empty[-1], empty[pos]
+            self._mrv_unassign(undo, bit)
+        return False
+
+    def _mrv_assign(self, idx: int, bit: int) -> _MrvUndo | None:
+        """Place ``bit`` in ``idx``, forward checking for cells left without a candidate
+        and for digits left without a place in a unit.
+
+        The digit leaves the candidates of the peers, and the cell stops offering its
+        other candidates to its units.
+        Returns:
+            _MrvUndo | None: What ``_mrv_unassign`` needs to take the step back, or None
+                (with everything already restored) if it led to a contradiction.
+        """
+        size = self.size
+        candidates, counts, values, places = (
+            self._mrv_candidates,
+            self._mrv_counts,
+            self._mrv_values,
+            self._mrv_places,
+        )
+        cell_units = self.geometry.cell_unit_lists
+        changed: list[int] = []
+        decremented: list[int] = []
+        saved: list[tuple[int, int]] = []
+        undo = changed, decremented, saved
+
+        other = candidates[idx] ^ bit
+        while other:
+            low = other & -other
+            other ^= low
+            offset = low.bit_length() - 1
+            for unit in cell_units[idx]:
+                key = unit * size + offset
+                places[key] -= 1
+                decremented.append(key)
+                if not places[key]:
+                    self._mrv_unassign(undo, bit)
+                    return None
+
+        offset = bit.bit_length() - 1
+        for unit in cell_units[idx]:
+            key = unit * size + offset
+            saved.append((key, places[key]))
+            places[key] = _PLACED
+
+        for peer in self.geometry.peer_lists[idx]:
+            # Filled peers keep their stale candidates; only open cells count.
+            if candidates[peer] & bit and not values[peer]:
+                candidates[peer] ^= bit
+                counts[peer] -= 1
+                changed.append(peer)
+                if not counts[peer]:
+                    self._mrv_unassign(undo, bit)
+                    return None
+                for unit in cell_units[peer]:
+                    key = unit * size + offset
+                    places[key] -= 1
+                    decremented.append(key)
+                    if not places[key]:
+                        self._mrv_unassign(undo, bit)
+                        return None
+        return undo
+
+    def _mrv_unassign(self, undo: _MrvUndo, bit: int) -> None:
+        """Take back an ``_mrv_assign``."""
+        changed, decremented, saved = undo
+        candidates, counts, places = (
+            self._mrv_candidates,
+            self._mrv_counts,
+            self._mrv_places,
+        )
+        for peer in changed:
+            candidates[peer] |= bit
+            counts[peer] += 1
+        for key in decremented:
+            places[key] += 1
+        for key, value in saved:
+            places[key] = value
+
+    def _prepare_search(self) -> None:
+        """Snapshot the empty cells and occupancy masks as plain ints for the search."""
+        self._search_cells = [
+            (x, y, section)
+            for (x, y), section in zip(
+                self.geometry.cell_coords, self.geometry.cell_section.tolist()
+            )
+            if self.is_cell_empty(x, y)
+        ]
+        self._search_candidates = [
+            int(self.candidate_masks[x, y]) for x, y, _section in self._search_cells
+        ]
+        self._search_masks = (
+            self.row_masks.tolist(),
+            self.column_masks.tolist(),
+            self.section_masks.tolist(),
+        )
 
-            for n in self.get_valid_numbers_for_cell(x, y):
-                self.sudoku_array[x, y] = n
-                self._backpropagation_all_solutions(x * 9 + y + 1)
-                self.sudoku_array[x, y] = 0
+    def _backpropagation_single_solutonion(self, depth: int) -> bool:
+        """Solve the Sudoku puzzle using backpropagation for a single solution."""
+        monitor = self._monitor
+        if monitor is not None:
+            monitor.tick(depth)
+        if depth == len(self._search_cells):
+            self.solutions.append(self.sudoku_array.copy())
+            if monitor is not None:
+                monitor.solutions += 1
+            return True
+
+        x, y, section = self._search_cells[depth]
+        rows, columns, sections = self._search_masks
+        free = self._search_candidates[depth] & ~(
+            rows[x] | columns[y] | sections[section]
+        )
+        while free:
+            bit = free & -free
+            free ^= bit
+            rows[x] |= bit
+            columns[y] |= bit
+            sections[section] |= bit
+            self.sudoku_array[x, y] = bit.bit_length()
+            if self._backpropagation_single_solutonion(depth + 1):
+                return True
+            rows[x] ^= bit
+            columns[y] ^= bit
+            sections[section] ^= bit
+        self.sudoku_array[x, y] = 0
+        return False
+
+    def _backpropagation_all_solutions(self, depth: int) -> None:
+        """Solve the Sudoku puzzle using backpropagation for all solutions."""
+        monitor = self._monitor
+        if monitor is not None:
+            monitor.tick(depth)
+        if depth == len(self._search_cells):
+            self.solutions.append(self.sudoku_array.copy())
+            if monitor is not None:
+                monitor.solutions += 1
             return
 
-        self.solutions.append(self.sudoku_array.copy())
-        print(len(self.solutions), end="\r")
+        x, y, section = self._search_cells[depth]
+        rows, columns, sections = self._search_masks
+        free = self._search_candidates[depth] & ~(
+            rows[x] | columns[y] | sections[section]
+        )
+        while free:
+            bit = free & -free
+            free ^= bit
+            rows[x] |= bit
+            columns[y] |= bit
+            sections[section] |= bit
+            self.sudoku_array[x, y] = bit.bit_length()
+            self._backpropagation_all_solutions(depth + 1)
+            rows[x] ^= bit
+            columns[y] ^= bit
+            sections[section] ^= bit
+        self.sudoku_array[x, y] = 0
 
     def is_solved(self) -> bool:
         """Check if the Sudoku puzzle is solved."""
         return self._is_array_valid_solution(self.sudoku_array)
 
     def _is_array_valid_solution(self, solution: np.ndarray) -> bool:
-        return self.validate(solution) and np.count_nonzero(solution) == 81
+        return self.validate(solution) and np.count_nonzero(solution) == solution.size
 
     def test_all_solutions(self):
         """Test all solutions."""
@@ -344,34 +1072,15 @@ class Table:
 
     def validate(self, array) -> bool:
         """Make sure no number is repeated in the same row, column or section."""
-        result = True
-        for idx in range(9):
-            if len(set(array[idx]) - {0}) != np.count_nonzero(array[idx]):
-                print("Not all values are unique in row %s" % idx)
-                result = False
-
-            if len(set(array[:, idx]) - {0}) != np.count_nonzero(array[:, idx]):
-                print("Not all values are unique in column %s" % idx)
-                result = False
-
-            section = self.get_section_by_idx(array, idx)
-            if len(set(section.flatten()) - {0}) != np.count_nonzero(section):
-                print("Not all values are unique in section %s" % idx)
-                result = False
-
-        return result
+        return bool(validate_grids(array).valid)
 
     def num_candidates(self) -> int:
         """Get the number of candidates in the Sudoku puzzle."""
-        result = 0
-        for cell_candidates in self.candidates.flatten():
-            if cell_candidates is not None:
-                result += len(cell_candidates)
-        return result
+        return int(np.bitwise_count(self.candidate_masks).sum())
 
     def candidates_contain(self, number: int, x: int, y: int) -> bool:
         """Check if the candidates contain the number."""
-        return self.candidates[x, y] is not None and number in self.candidates[x, y]
+        return bool(self.candidate_masks[x, y] & digit_mask(number))
 
     def print(self) -> None:
         for row in self.__print_table_row(self.sudoku_array, self.empty):
@@ -397,18 +1106,21 @@ class Table:
         )
 
     def __print_table_row(self, array, empty) -> Iterator[str]:
-        for x in range(9):
+        box, size = self.geometry.box, self.size
+        width = len(str(size))
+        separator = "-" * (box * (2 + box * (width + 1)) + 1)
+        for x in range(size):
             result = ""
-            if x % 3 == 0:
-                yield "-" * 25
-            for y in range(9):
-                if y % 3 == 0:
+            if x % box == 0:
+                yield separator
+            for y in range(size):
+                if y % box == 0:
                     result += "| "
-                result += empty if array[x, y] == 0 else str(array[x, y])
+                result += (empty if array[x, y] == 0 else str(array[x, y])).rjust(width)
                 result += " "
             result += "|"
             yield result
-        yield "-" * 25
+        yield separator
 
     def get_string_section_by_idx(self, idx: int) -> list:
         current_section = self.get_section_by_idx(self.sudoku_array, idx).flatten()
@@ -421,7 +1133,7 @@ class Table:
 
     def reset_given_sudoku(self) -> None:
         """Reset the given Sudoku to empty."""
-        self.given_sudoku = np.zeros((9, 9), dtype=np.int8)
+        self.given_sudoku = np.zeros((self.size, self.size), dtype=np.int8)
 
     def set_given_sudoku(self) -> None:
         """Set the given Sudoku to the current Sudoku."""
@@ -439,14 +1151,79 @@ class Table:
     def replace_sudoku(self, new_sudoku: np.ndarray | None) -> None:
         """Replace the Sudoku puzzle with a new Sudoku."""
         if new_sudoku is None:
-            self.__init__()
+            self.__init__(box=self.geometry.box)
             return
 
-        assert new_sudoku.shape == (9, 9)
+        assert new_sudoku.shape == (self.size, self.size)
         self.sudoku_array = new_sudoku
         self.gen_candidates()
 
 
+def solve_batch(
+    puzzles: np.ndarray,
+    engine: Engine | None = None,
+    techniques: Sequence[tuple[str, Technique]] = TECHNIQUES[:2],
+    chunk_size: int = 4096,
+) -> np.ndarray:
+    """Solve a stack of puzzles, propagating all of them at once.
+
+    Singles (or the given techniques) are applied to one ``(B, N, N, N)`` candidate
+    cube for every board together; only boards the propagation leaves unsolved fall
+    back to a per-board ``Table.solve``.
+
+    Args:
+        puzzles (np.ndarray): A ``(B, N, N)`` array of puzzles, 0 for empty cells.
+        engine (Engine | None, optional): The search used for boards propagation can't finish.
+            None picks "mrv" on 9x9 boards and ``LARGE_BOARD_ENGINE`` on larger ones.
+            Defaults to None.
+        techniques (Sequence[tuple[str, Technique]], optional): The techniques run on the whole batch.
+            Defaults to naked and hidden singles.
+        chunk_size (int, optional): How many boards to propagate together, bounding memory use.
+    Returns:
+        np.ndarray: A ``(B, N, N)`` int8 array of solutions; boards without a solution are all zeros.
+    """
+    puzzles = np.asarray(puzzles)
+    assert puzzles.ndim == 3
+    size = grid_geometry(puzzles).size
+    if engine is None:
+        engine = "mrv" if size <= 9 else LARGE_BOARD_ENGINE
+
+    solutions = np.zeros(puzzles.shape, dtype=np.int8)
+    for start in range(0, len(puzzles), chunk_size):
+        chunk = puzzles[start : start + chunk_size]
+        cube = np.where(
+            chunk[..., None] > 0, chunk[..., None] == np.arange(1, size + 1), True
+        )
+
+        active = np.arange(len(chunk))
+        stalled = []
+        while len(active):
+            boards = cube[active]
+            eliminations = np.zeros_like(boards)
+            for _name, technique in techniques:
+                eliminations |= technique(boards)
+            boards &= ~eliminations
+            cube[active] = boards
+
+            consistent = is_consistent(boards)
+            solved = (boards.sum(axis=-1) == 1).all(axis=(-2, -1))
+            progressed = eliminations.any(axis=(-3, -2, -1))
+            stalled.extend(active[consistent & ~solved & ~progressed])
+            active = active[consistent & ~solved & progressed]
+
+        done = (cube.sum(axis=-1) == 1).all(axis=(-2, -1)) & is_consistent(cube)
+        solutions[start : start + len(chunk)][done] = cube[done].argmax(axis=-1) + 1
+
+        for idx in stalled:
+            table = Table(chunk[idx])
+            table.load_candidate_cube(cube[idx])
+            table.solve(engine=engine)
+            if table.solutions:
+                solutions[start + idx] = table.solutions[0]
+
+    return solutions
+
+
 if __name__ == "__main__":
     sudoku = [
         [0, 0, 7, 9, 3, 0, 0, 0, 8],
@@ -488,4 +1265,43 @@ if __name__ == "__main__":
     print("Number of solutions:", len(t.solutions))
     print("Completed in:", end)
 
+    # Overwriting a filled cell must leave the same state as filling it directly.
+    overwritten = Table(sudoku)
+    overwritten.insert_number(1, 0, 0)
+    overwritten.insert_number(2, 0, 0)
+    direct = Table(sudoku)
+    direct.insert_number(2, 0, 0)
+    for name in ("candidate_masks", "row_masks", "column_masks", "section_masks"):
+        assert np.array_equal(getattr(overwritten, name), getattr(direct, name)), name
+    assert overwritten.count_solutions() == direct.count_solutions()
+
+    # A grid that sent the bounded count into a >10 s search before unit places
+    # were tracked; it has several solutions.
+    digit_bound = Table(
+        np.array(
+            [
+                int(c) if c != "." else 0
+                for c in ".....6....59.....82....8....45........3........6.."
+                "3.54...325..6.................."
+            ]
+        ).reshape(9, 9)
+    )
+    start = time()
+    assert not digit_bound.has_unique_solution()
+    print("Uniqueness check of a digit-bound grid:", time() - start)
+
+    # Larger boards solve with the default engine: a 16x16 band/stack pattern grid,
+    # relabelled, with 65% of its cells cleared.
+    rng = np.random.default_rng(0)
+    box, size = 4, 16
+    lines = np.arange(size)
+    pattern = (box * (lines[:, None] % box) + lines[:, None] // box + lines) % size
+    large = (rng.permutation(size) + 1)[pattern].astype(np.int8).ravel()
+    large[rng.choice(large.size, int(0.65 * large.size), replace=False)] = 0
+    large_table = Table(large.reshape(size, size))
+    start = time()
+    large_table.solve(monitor=SearchMonitor(timeout=20))
+    assert large_table.is_solved()
+    print("16x16 with the default engine:", time() - start)
+
     # print("Number of left over candidates:", t.num_candidates())
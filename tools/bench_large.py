@@ -0,0 +1,76 @@
+#! ./.venv/bin/python
+"""Time the solver engines on large boards with a given share of empty cells.
+
+Every board is a band/stack pattern grid with its digits shuffled and a random
+``--empty`` share of its cells cleared, all drawn from the board's seed, so the
+same seeds give the same boards on every machine. Each engine gets ``--timeout``
+seconds per board; unfinished boards are reported as such.
+
+Usage::
+
+    python -m tools.bench_large --box 5 --empty 0.6 --seeds 8 --engines restarts,dlx
+"""
+
+from __future__ import annotations
+
+import argparse
+from time import perf_counter
+from typing import get_args
+
+import numpy as np
+
+from core.monitor import SearchMonitor
+from core.sudoku import Engine, Table
+
+
+def pattern_board(box: int, empty: float, seed: int) -> np.ndarray:
+    """A solved ``box**2 x box**2`` pattern grid with ``empty`` of its cells cleared."""
+    rng = np.random.default_rng(seed)
+    size = box * box
+    lines = np.arange(size)
+    pattern = (box * (lines[:, None] % box) + lines[:, None] // box + lines) % size
+    grid = (rng.permutation(size) + 1)[pattern].astype(np.int8).ravel()
+    grid[rng.choice(grid.size, int(empty * grid.size), replace=False)] = 0
+    return grid.reshape(size, size)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--box", type=int, default=5)
+    parser.add_argument("--empty", type=float, default=0.6)
+    parser.add_argument("--seeds", type=int, default=8)
+    parser.add_argument(
+        "--engines",
+        default="restarts,mrv,dlx",
+        help=f"Comma-separated, from {', '.join(get_args(Engine))}",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=40.0, help="Seconds allowed per board"
+    )
+    args = parser.parse_args(argv)
+    engines = args.engines.split(",")
+    for engine in engines:
+        if engine not in get_args(Engine):
+            parser.error(f"Unknown engine: {engine!r}")
+
+    totals = dict.fromkeys(engines, 0.0)
+    for seed in range(args.seeds):
+        board = pattern_board(args.box, args.empty, seed)
+        for engine in engines:
+            table = Table(board.copy())
+            monitor = SearchMonitor(timeout=args.timeout)
+            start = perf_counter()
+            table.solve(engine=engine, monitor=monitor)
+            elapsed = perf_counter() - start
+            totals[engine] += elapsed
+            outcome = "solved" if table.is_solved() else "unfinished"
+            print(
+                f"seed {seed:3d} {engine:9s} {outcome:10s} {elapsed:7.2f}s "
+                f"{monitor.nodes:9d} nodes"
+            )
+    for engine, total in totals.items():
+        print(f"{engine:9s} total {total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#! ./.venv/bin/python
+"""Solve a file of puzzles across all cores.
+
+Reads either 81 characters per line (``0`` or ``.`` for empty cells) or an
+``(N, 9, 9)`` ``.npy`` array and writes one solution line per puzzle, in input order,
+with the solve time of each puzzle next to it.
+
+Usage::
+
+    python -m tools.bulk_solve puzzles.txt -o solutions.txt --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import TextIO, TypeVar, get_args
+
+import numpy as np
+
+from core.monitor import SearchMonitor
+from core.sudoku import Engine, Table
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+_DEFAULT_CHUNK_SIZE = 256
+
+
+def parse_puzzle_line(line: str) -> np.ndarray:
+    """Parse an 81-character puzzle line into a 9x9 array."""
+    line = line.strip()
+    if len(line) != 81:
+        raise ValueError(f"Expected 81 characters per puzzle, got {len(line)}")
+    digits = [0 if char in ".0" else int(char) for char in line]
+    return np.array(digits, dtype=np.int8).reshape(9, 9)
+
+
+def format_puzzle_line(grid: np.ndarray) -> str:
+    """Format a 9x9 array as an 81-character line, ``0`` for empty cells."""
+    return "".join(str(int(value)) for value in grid.ravel())
+
+
+def iter_puzzle_chunks(path: Path, chunk_size: int) -> Iterator[np.ndarray]:
+    """Stream ``(n, 9, 9)`` chunks of puzzles from a text or ``.npy`` file."""
+    if path.suffix == ".npy":
+        puzzles = np.load(path, mmap_mode="r")
+        for start in range(0, len(puzzles), chunk_size):
+            yield np.array(puzzles[start : start + chunk_size], dtype=np.int8)
+        return
+
+    chunk: list[np.ndarray] = []
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            if not line.strip() or line.startswith("#"):
+                continue
+            chunk.append(parse_puzzle_line(line))
+            if len(chunk) == chunk_size:
+                yield np.stack(chunk)
+                chunk = []
+    if chunk:
+        yield np.stack(chunk)
+
+
+def solve_chunk(
+    puzzles: np.ndarray, engine: Engine = "mrv", timeout: float | None = None
+) -> tuple[np.ndarray, list[float]]:
+    """Solve every puzzle of a chunk, timing each one.
+
+    A puzzle that takes longer than ``timeout`` seconds is given up on and counts as
+    unsolvable.
+
+    Returns:
+        tuple[np.ndarray, list[float]]: The solutions (all zeros when unsolvable) and
+            the seconds spent on each puzzle.
+    """
+    solutions = np.zeros(puzzles.shape, dtype=np.int8)
+    timings = []
+    for idx, puzzle in enumerate(puzzles):
+        start = perf_counter()
+        table = Table(puzzle)
+        monitor = None if timeout is None else SearchMonitor(timeout=timeout)
+        table.solve(engine=engine, monitor=monitor)
+        if table.solutions:
+            solutions[idx] = table.solutions[0]
+        timings.append(perf_counter() - start)
+    return solutions, timings
+
+
+def ordered_map(
+    executor: ProcessPoolExecutor,
+    fn: Callable[..., _R],
+    items: Iterable[_T],
+    *args,
+    window: int,
+) -> Iterator[_R]:
+    """Like ``executor.map`` but with at most ``window`` tasks in flight.
+
+    ``Executor.map`` submits the whole input up front, which would read an entire
+    puzzle file into memory before the first result is written.
+    """
+    pending: deque[Future[_R]] = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def bulk_solve(
+    source: Path,
+    output: TextIO,
+    *,
+    engine: Engine = "mrv",
+    workers: int | None = None,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
+    timeout: float | None = None,
+) -> tuple[int, int]:
+    """Solve every puzzle in ``source`` and write ``<solution>\\t<seconds>`` lines to ``output``.
+
+    Returns:
+        tuple[int, int]: The number of puzzles read and the number solved.
+    """
+    workers = workers or os.cpu_count() or 1
+    total = solved = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = iter_puzzle_chunks(source, chunk_size)
+        for solutions, timings in ordered_map(
+            executor, solve_chunk, chunks, engine, timeout, window=2 * workers
+        ):
+            for solution, seconds in zip(solutions, timings):
+                output.write(f"{format_puzzle_line(solution)}\t{seconds:.6f}\n")
+                total += 1
+                solved += bool(solution.any())
+    return total, solved
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("puzzles", type=Path, help="81-char-per-line text or .npy")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Solutions file (default: stdout)"
+    )
+    parser.add_argument("--engine", choices=get_args(Engine), default="mrv")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=_DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="Seconds allowed per puzzle"
+    )
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    output = (
+        sys.stdout if args.output is None else args.output.open("w", encoding="utf-8")
+    )
+    try:
+        total, solved = bulk_solve(
+            args.puzzles,
+            output,
+            engine=args.engine,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            timeout=args.timeout,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = perf_counter() - start
+    print(f"Solved {solved}/{total} puzzles in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#! ./.venv/bin/python
+"""Generate a file of unique-solution puzzles.
+
+Writes one 81-character puzzle per line (``0`` for empty cells), optionally followed
+by its solution. The same ``--seed`` always produces the same file, whatever the
+number of workers.
+
+Usage::
+
+    python -m tools.generate_puzzles 10000 -o puzzles.txt --seed 1 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+from core.generator import SYMMETRIES, iter_puzzles
+from tools.bulk_solve import format_puzzle_line
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("count", type=int, help="Number of puzzles")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Puzzles file (default: stdout)"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--clues", type=int, default=0, help="Target clue count (default: minimal)"
+    )
+    parser.add_argument("--symmetry", choices=SYMMETRIES, default="none")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--solutions", action="store_true", help="Append a tab and the solution"
+    )
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    output = (
+        sys.stdout if args.output is None else args.output.open("w", encoding="utf-8")
+    )
+    try:
+        for puzzles, solutions in iter_puzzles(
+            args.count,
+            seed=args.seed,
+            clues=args.clues,
+            symmetry=args.symmetry,
+            workers=args.workers,
+        ):
+            for puzzle, solution in zip(puzzles, solutions):
+                line = format_puzzle_line(puzzle)
+                if args.solutions:
+                    line += "\t" + format_puzzle_line(solution)
+                output.write(line + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = perf_counter() - start
+    print(f"Generated {args.count} puzzles in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,27 @@ from __future__ import annotations
 from time import perf_counter
 
 import cv2
+import numpy as np
 from kivy import platform
+from kivy.clock import Clock
 from kivy.factory import Factory
 from kivy.graphics.texture import Texture
 from kivy.properties import BooleanProperty
 from kivy.uix.image import Image
 
 from app.utils import get_app
-from core.vision import draw_contours, find_sudoku_quad
-
-# Contour detection rate; preview still updates every frame using the last contour.
+from core.vision import (
+    DetectionWorker,
+    QuadTracker,
+    draw_contours,
+    find_sudoku_quad,
+)
+
+# Contour detection rate while nothing is tracked; preview still updates every frame.
 _DETECT_INTERVAL_S = 1 / 10
+# While the corners are tracked, full detection only re-checks (and corrects drift)
+# this often.
+_REDETECT_INTERVAL_S = 1.0
 
 # Preview highlight: outline always; set False to skip the filled blend (cheaper).
 _HIGHLIGHT_FILL = platform != "android"
@@ -39,6 +49,8 @@ class CameraPreview(Image):
         self.success_contour = None
         self._last_contour = None
         self._next_detect_at = 0.0
+        self._tracker = QuadTracker()
+        self._detector: DetectionWorker | None = None
         self._preview_texture: Texture | None = None
         kwargs = dict(kwargs)
         kwargs.pop("play", None)
@@ -48,6 +60,7 @@ class CameraPreview(Image):
     def start_capture(self):
         """Start capture via the subclass backend."""
         self.stop_capture()
+        self._detector = DetectionWorker(self._post_detection, self._detect)
         self._open_capture()
         self.toggle_capture_button(False)
 
@@ -58,6 +71,10 @@ class CameraPreview(Image):
         self.play = False
         self._last_contour = None
         self._next_detect_at = 0.0
+        self._tracker.reset(None, None)
+        if self._detector is not None:
+            self._detector.stop()
+            self._detector = None
         self._preview_texture = None
         self._close_capture()
 
@@ -81,14 +98,23 @@ class CameraPreview(Image):
 
         self.toggle_capture_button(self.success_img is not None)
 
-        if now >= self._next_detect_at:
-            self._next_detect_at = now + _DETECT_INTERVAL_S
-            self._last_contour = find_sudoku_quad(frame_rgba)
-
-            if self._last_contour is not None:
+        if self._tracker.active:
+            self._last_contour = self._tracker.track(frame_rgba)
+            if self._last_contour is None:
+                # Lost the corners: look for the grid again right away.
+                self._next_detect_at = now
+            else:
                 self.success_img = frame_rgba
                 self.success_contour = self._last_contour
 
+        detector = self._detector
+        if now >= self._next_detect_at and detector is not None and not detector.busy:
+            # Detection runs on the worker; the result arrives in ``_on_detection``.
+            # While it is still busy the deadline stays due, so the first frame after
+            # it finishes goes out instead of one that would only wait in its queue.
+            self._next_detect_at = now + _DETECT_INTERVAL_S
+            detector.submit(frame_rgba)
+
         if self._last_contour is not None:
             frame_with_highlight = frame_rgba.copy()
             draw_contours(
@@ -109,6 +135,39 @@ class CameraPreview(Image):
             return
         self.canvas.ask_update()
 
+    def _detect(self, frame_rgba: np.ndarray) -> np.ndarray | None:
+        """Worker-thread detector: search around the quad on screen first."""
+        return find_sudoku_quad(frame_rgba, previous=self._last_contour)
+
+    def _post_detection(self, frame_rgba: np.ndarray, quad: np.ndarray | None) -> None:
+        """Worker-thread callback: hand the result over to the Kivy thread."""
+        detector = self._detector
+        Clock.schedule_once(lambda _dt: self._on_detection(detector, frame_rgba, quad))
+
+    def _on_detection(
+        self,
+        detector: DetectionWorker | None,
+        frame_rgba: np.ndarray,
+        quad: np.ndarray | None,
+    ) -> None:
+        if detector is None or detector is not self._detector:
+            # A late result of a capture that has been stopped since.
+            return
+        if quad is not None:
+            # Tracking picks up from the detected frame, catching up on the frames
+            # that went by during detection.
+            self._tracker.reset(frame_rgba, quad)
+            self._last_contour = quad
+            self.success_img = frame_rgba
+            self.success_contour = quad
+            self._next_detect_at = perf_counter() + _REDETECT_INTERVAL_S
+        elif self._tracker.active:
+            # A failed re-check keeps a healthy track; check again at the usual pace
+            # rather than at the full detection rate.
+            self._next_detect_at = perf_counter() + _REDETECT_INTERVAL_S
+        else:
+            self._last_contour = None
+
     def toggle_capture_button(self, enabled: bool) -> None:
         camera_screen = get_app().sm.get_screen("camera")  # pyright: ignore[reportOptionalMemberAccess]
         capture_button = camera_screen.ids.capture_sudoku_button